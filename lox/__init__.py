@@ -46,7 +46,8 @@ def eval(
             ambiente vazio será criado. Aceita um dicionário mapeando nomes de
             variáveis para seus valores ou uma instância de `Ctx`.
         skip_validation:
-            Se `True`, ignora a validação do código fonte antes da avaliação.
+            Se `True`, ignora a validação de `src` quando ele já é um nó AST.
+            Código fonte em string é sempre validado por `parse`.
     """
     if env is None:
         env = Ctx.from_dict({})
@@ -55,12 +56,12 @@ def eval(
 
     if isinstance(src, Node):
         ast = src
+        if not skip_validation:
+            ast.validate_tree()
     else:
+        # A função parse já valida a árvore
         ast = parse(src)
 
-    if not skip_validation:
-        ast.validate_tree()
-
     try:
         return ast.eval(env)
     except Exception as e:
@@ -1,7 +1,9 @@
+import builtins
 from abc import ABC
 from dataclasses import dataclass, field
-from typing import Callable
-from .runtime import LoxFunction, LoxReturn, LoxClass, LoxInstance, LoxError, print as lox_print
+from typing import TYPE_CHECKING, Callable, ClassVar
+from . import runtime
+from .runtime import LoxFunction, ReturnMarker, LoxClass, LoxInstance, LoxError, print as lox_print, show, truthy
 
 from .ctx import Ctx
 
@@ -9,11 +11,14 @@ from .ctx import Ctx
 from .node import Node, Cursor
 from .errors import SemanticError
 
+if TYPE_CHECKING:
+    from .vm import Code
+
 # Palavras reservadas da linguagem Lox
-RESERVED_WORDS = {
+RESERVED_WORDS = frozenset({
     "and", "class", "else", "false", "for", "fun", "if", "nil",
     "or", "print", "return", "this", "true", "var", "while"
-}
+})
 
 # TIPOS BÁSICOS
 
@@ -22,22 +27,44 @@ Value = bool | str | float | None
 
 class Expr(Node, ABC):
     """Classe base para expressões."""
+    __slots__ = ()
 
 class Stmt(Node, ABC):
     """Classe base para comandos."""
+    __slots__ = ()
 
-@dataclass
+@dataclass(slots=True)
 class Program(Node):
     """Representa um programa."""
     stmts: list[Stmt]
+    _code: "Code | None" = field(default=None, init=False, repr=False, compare=False)
 
     def eval(self, ctx: Ctx):
-        for stmt in self.stmts:
-            stmt.eval(ctx)
+        from .vm import VM
+
+        VM(self.code()).run(ctx)
+
+    def code(self) -> "Code":
+        """
+        Retorna o bytecode do programa.
+
+        Na primeira chamada, prepara a árvore para execução (dobra de
+        constantes, resolução de nomes e especialização de nós) e compila o
+        resultado. O código é reaproveitado nas execuções seguintes.
+        """
+        from .resolver import resolve
+        from .vm import Compiler
+
+        if self._code is None:
+            fold(self)
+            resolve(self)
+            specialize(self)
+            self._code = Compiler().compile(self)
+        return self._code
 
 # EXPRESSÕES
 
-@dataclass
+@dataclass(slots=True)
 class BinOp(Expr):
     """Uma operação infixa com dois operandos."""
     left: Expr
@@ -45,18 +72,122 @@ class BinOp(Expr):
     op: Callable[[Value, Value], Value]
 
     def eval(self, ctx: Ctx):
-        left_value = self.left.eval(ctx)
-        right_value = self.right.eval(ctx)
-        return self.op(left_value, right_value)
+        op = self.op
+        return op(self.left.eval(ctx), self.right.eval(ctx))
 
-@dataclass
+# Operações especializadas (ver `specialize`). Quando os dois operandos são
+# números, a operação é feita diretamente; nos demais casos (strings, erros),
+# a função original em `op` é chamada.
+
+class AddNum(BinOp):
+    """Soma com caminho rápido para números."""
+    __slots__ = ()
+
+    def eval(self, ctx: Ctx):
+        a = self.left.eval(ctx)
+        b = self.right.eval(ctx)
+        if type(a) is float and type(b) is float:
+            return a + b
+        if type(a) is str and type(b) is str:
+            # O nó passa a concatenar strings nas próximas execuções
+            self.__class__ = AddStr
+            return a + b
+        return self.op(a, b)
+
+class AddStr(BinOp):
+    """
+    Soma com caminho rápido para strings.
+
+    Criada a partir de AddNum quando os operandos observados são strings.
+    """
+    __slots__ = ()
+
+    def eval(self, ctx: Ctx):
+        a = self.left.eval(ctx)
+        b = self.right.eval(ctx)
+        if type(a) is str and type(b) is str:
+            return a + b
+        return self.op(a, b)
+
+class SubNum(BinOp):
+    """Subtração com caminho rápido para números."""
+    __slots__ = ()
+
+    def eval(self, ctx: Ctx):
+        a = self.left.eval(ctx)
+        b = self.right.eval(ctx)
+        if type(a) is float and type(b) is float:
+            return a - b
+        return self.op(a, b)
+
+class MulNum(BinOp):
+    """Multiplicação com caminho rápido para números."""
+    __slots__ = ()
+
+    def eval(self, ctx: Ctx):
+        a = self.left.eval(ctx)
+        b = self.right.eval(ctx)
+        if type(a) is float and type(b) is float:
+            return a * b
+        return self.op(a, b)
+
+class LtNum(BinOp):
+    """Comparação '<' com caminho rápido para números."""
+    __slots__ = ()
+
+    def eval(self, ctx: Ctx):
+        a = self.left.eval(ctx)
+        b = self.right.eval(ctx)
+        if type(a) is float and type(b) is float:
+            return a < b
+        return self.op(a, b)
+
+class LeNum(BinOp):
+    """Comparação '<=' com caminho rápido para números."""
+    __slots__ = ()
+
+    def eval(self, ctx: Ctx):
+        a = self.left.eval(ctx)
+        b = self.right.eval(ctx)
+        if type(a) is float and type(b) is float:
+            return a <= b
+        return self.op(a, b)
+
+class GtNum(BinOp):
+    """Comparação '>' com caminho rápido para números."""
+    __slots__ = ()
+
+    def eval(self, ctx: Ctx):
+        a = self.left.eval(ctx)
+        b = self.right.eval(ctx)
+        if type(a) is float and type(b) is float:
+            return a > b
+        return self.op(a, b)
+
+class GeNum(BinOp):
+    """Comparação '>=' com caminho rápido para números."""
+    __slots__ = ()
+
+    def eval(self, ctx: Ctx):
+        a = self.left.eval(ctx)
+        b = self.right.eval(ctx)
+        if type(a) is float and type(b) is float:
+            return a >= b
+        return self.op(a, b)
+
+@dataclass(slots=True)
 class Var(Expr):
     """Uma variável no código."""
     name: str
+    # Distância até o escopo da declaração, calculada pelo resolver. None
+    # indica que a variável deve ser buscada dinamicamente.
+    depth: int | None = field(default=None, init=False, repr=False, compare=False)
 
     def eval(self, ctx: Ctx):
         try:
-            return ctx[self.name]
+            if self.depth is None:
+                return ctx[self.name]
+            return ctx.get_at(self.depth, self.name)
         except KeyError:
             raise NameError(f"variável {self.name} não existe!")
 
@@ -68,7 +199,7 @@ class Var(Expr):
                 token=self.name
             )
 
-@dataclass
+@dataclass(slots=True)
 class Literal(Expr):
     """Representa valores literais no código."""
     value: Value
@@ -76,13 +207,13 @@ class Literal(Expr):
     def eval(self, ctx: Ctx):
         return self.value
 
-@dataclass
+@dataclass(slots=True)
 class ExprStmt(Stmt):
     expr: Expr
     def eval(self, ctx: Ctx):
         self.expr.eval(ctx)
 
-@dataclass
+@dataclass(slots=True)
 class And(Expr):
     """Uma operação 'and'."""
     left: Expr
@@ -93,50 +224,187 @@ class And(Expr):
             return left_val
         return self.right.eval(ctx)
 
-@dataclass
+@dataclass(slots=True)
 class Or(Expr):
     """Uma operação 'or'."""
     left: Expr
     right: Expr
     def eval(self, ctx: Ctx):
         left_val = self.left.eval(ctx)
-        if left_val is not False and left_val is not None:
-            if isinstance(left_val, float) and left_val == 0: return left_val
-            if isinstance(left_val, str) and left_val == "": return left_val
-            return left_val
-        return self.right.eval(ctx)
+        if left_val is False or left_val is None:
+            return self.right.eval(ctx)
+        return left_val
 
-@dataclass
+@dataclass(slots=True)
 class UnaryOp(Expr):
     """Uma operação prefixa com um operando."""
     operand: Expr
     op: Callable[[Value], Value]
 
+    def eval(self, ctx: Ctx):
+        op = self.op
+        return op(self.operand.eval(ctx))
+
+class NegNum(UnaryOp):
+    """Negação aritmética com caminho rápido para números."""
+    __slots__ = ()
+
     def eval(self, ctx: Ctx):
         value = self.operand.eval(ctx)
+        if type(value) is float:
+            return -value
         return self.op(value)
 
-@dataclass
+class Not(UnaryOp):
+    """Negação lógica, sem chamar a função em `op`."""
+    __slots__ = ()
+
+    def eval(self, ctx: Ctx):
+        value = self.operand.eval(ctx)
+        return value is None or value is False
+
+@dataclass(slots=True)
 class Call(Expr):
-    """Uma chamada de função."""
+    """
+    Uma chamada de função.
+
+    Os argumentos são avaliados pelos nós, e não por métodos `eval` salvos,
+    pois um nó pode trocar de classe em tempo de execução (ver `AddNum`).
+    """
     callee: Expr
     params: list[Expr]
-    
+
     def eval(self, ctx: Ctx):
         func = self.callee.eval(ctx)
-        args = [param.eval(ctx) for param in self.params if param is not None]
+        args = [param.eval(ctx) for param in self.params]
         if callable(func):
             return func(*args)
         raise TypeError(f"'{func}' não é uma função!")
 
-@dataclass
+
+# Versões especializadas de Call para um número fixo de argumentos. Evitam a
+# criação da lista de argumentos e do desempacotamento com *args. São
+# instaladas pela função `specialize`, que troca a classe do nó. Em vez de
+# testar se func é chamável a cada execução, deixam o Python levantar o
+# TypeError e só então verificam a causa do erro. Funções Lox são chamadas
+# diretamente por `LoxFunction.call`, sem passar por `__call__`.
+
+class Call0(Call):
+    """Chamada sem argumentos."""
+    __slots__ = ()
+
+    def eval(self, ctx: Ctx):
+        func = self.callee.eval(ctx)
+        if type(func) is LoxFunction:
+            return func.call(())
+        try:
+            return func()
+        except TypeError:
+            _check_callable(func)
+            raise
+
+class Call1(Call):
+    """Chamada com um argumento."""
+    __slots__ = ()
+
+    def eval(self, ctx: Ctx):
+        func = self.callee.eval(ctx)
+        a = self.params[0].eval(ctx)
+        if type(func) is LoxFunction:
+            return func.call((a,))
+        try:
+            return func(a)
+        except TypeError:
+            _check_callable(func)
+            raise
+
+class Call2(Call):
+    """Chamada com dois argumentos."""
+    __slots__ = ()
+
+    def eval(self, ctx: Ctx):
+        func = self.callee.eval(ctx)
+        params = self.params
+        a = params[0].eval(ctx)
+        b = params[1].eval(ctx)
+        if type(func) is LoxFunction:
+            return func.call((a, b))
+        try:
+            return func(a, b)
+        except TypeError:
+            _check_callable(func)
+            raise
+
+class Call3(Call):
+    """Chamada com três argumentos."""
+    __slots__ = ()
+
+    def eval(self, ctx: Ctx):
+        func = self.callee.eval(ctx)
+        params = self.params
+        a = params[0].eval(ctx)
+        b = params[1].eval(ctx)
+        c = params[2].eval(ctx)
+        if type(func) is LoxFunction:
+            return func.call((a, b, c))
+        try:
+            return func(a, b, c)
+        except TypeError:
+            _check_callable(func)
+            raise
+
+class Invoke(Call):
+    """
+    Chamada de método, na forma `obj.método(...)`.
+
+    Quando o atributo é um método Lox, ele é chamado diretamente com o `this`
+    correspondente, sem criar a função vinculada que `Getattr` produziria.
+    """
+    __slots__ = ()
+
+    def eval(self, ctx: Ctx):
+        callee = self.callee
+        obj = callee.obj.eval(ctx)
+        method = callee.method_for(obj)
+        if method is not None:
+            return method.call_bound(obj, [param.eval(ctx) for param in self.params])
+
+        func = callee.get(obj)
+        args = [param.eval(ctx) for param in self.params]
+        if type(func) is LoxFunction:
+            return func.call(args)
+        try:
+            return func(*args)
+        except TypeError:
+            _check_callable(func)
+            raise
+
+class SuperInvoke(Call):
+    """
+    Chamada de método da superclasse, na forma `super.método(...)`.
+
+    Como em Invoke, o método é chamado diretamente com o `this`, sem criar a
+    função vinculada.
+    """
+    __slots__ = ()
+
+    def eval(self, ctx: Ctx):
+        method, this = self.callee.lookup(ctx)
+        return method.call_bound(this, [param.eval(ctx) for param in self.params])
+
+def _check_callable(func):
+    if not callable(func):
+        raise TypeError(f"'{func}' não é uma função!")
+
+@dataclass(slots=True)
 class This(Expr):
     """Acesso ao `this`."""
-    # Campo vazio para evitar problemas com dataclasses sem campos
-    _dummy: str = field(default="", init=False, repr=False)
-    
+    depth: int | None = field(default=None, init=False, repr=False, compare=False)
+
     def eval(self, ctx: Ctx):
         try:
+            if self.depth is not None:
+                return ctx.get_at(self.depth, "this")
             return ctx["this"]
         except KeyError:
             raise NameError("variável this não existe!")
@@ -153,18 +421,49 @@ class This(Expr):
             token="this"
         )
 
-@dataclass
+@dataclass(slots=True)
 class Super(Expr):
-    """Acesso a método ou atributo da superclasse."""
+    """
+    Acesso a método ou atributo da superclasse.
+
+    A superclasse de um método nunca muda, então o método encontrado é
+    guardado junto com a classe em que foi buscado e reaproveitado enquanto a
+    mesma superclasse aparecer no contexto.
+    """
     method: str
-    
+    # Distância até o escopo de "super"; o de "this" fica logo abaixo dele
+    depth: int | None = field(default=None, init=False, repr=False, compare=False)
+    _ic_class: LoxClass | None = field(default=None, init=False, repr=False, compare=False)
+    _ic_method: LoxFunction | None = field(default=None, init=False, repr=False, compare=False)
+
     def eval(self, ctx: Ctx):
-        method_name = self.method
-        super_class = ctx["super"]
-        this = ctx["this"]
-        method = super_class.get_method(method_name)
+        method, this = self.lookup(ctx)
         return method.bind(this)
 
+    def lookup(self, ctx: Ctx) -> tuple[LoxFunction, Value]:
+        """
+        Retorna o método da superclasse, ainda não vinculado, e o `this`.
+        """
+        depth = self.depth
+        if depth is None:
+            super_class = ctx["super"]
+            this = ctx["this"]
+        else:
+            super_class = ctx.get_at(depth, "super")
+            this = ctx.get_at(depth - 1, "this")
+        return self.find(super_class), this
+
+    def find(self, super_class: LoxClass) -> LoxFunction:
+        """
+        Busca o método na superclasse, usando o cache.
+        """
+        if super_class is self._ic_class:
+            return self._ic_method
+        method = super_class.get_method(self.method)
+        self._ic_class = super_class
+        self._ic_method = method
+        return method
+
     def validate_self(self, cursor: Cursor):
         """Verifica se super está dentro de uma classe que herda de outra."""
         # Itera pelos pais para encontrar uma Class com superclasse
@@ -184,34 +483,89 @@ class Super(Expr):
             token="super"
         )
 
-@dataclass
+@dataclass(slots=True)
 class Assign(Expr):
     """Atribuição de variável."""
     name: str
     value: Expr
+    depth: int | None = field(default=None, init=False, repr=False, compare=False)
 
     def eval(self, ctx: Ctx):
         result = self.value.eval(ctx)
-        ctx.assign(self.name, result)
+        if self.depth is None:
+            ctx.assign(self.name, result)
+        else:
+            ctx.assign_at(self.depth, self.name, result)
         return result
 
+# Getattr mantém o __dict__: os testes do exercício 03 inspecionam os
+# atributos do nó através dele.
 @dataclass
 class Getattr(Expr):
     """Acesso a atributo de um objeto."""
     obj: Expr
     name: str
+    # Cache monomórfico: guarda o método encontrado para a última classe
+    # observada neste ponto do código. Como os métodos de uma classe Lox não
+    # mudam após a sua criação, a identidade da classe basta como chave.
+    _ic_class: LoxClass | None = field(default=None, init=False, repr=False, compare=False)
+    _ic_method: LoxFunction | None = field(default=None, init=False, repr=False, compare=False)
 
     def eval(self, ctx: Ctx):
-        obj_value = self.obj.eval(ctx)
-        
-        # Use getattr normal para todos os objetos (incluindo LoxInstance)
-        # A lógica específica para LoxInstance está no __getattr__ da classe
+        return self.get(self.obj.eval(ctx))
+
+    def get(self, obj_value: Value) -> Value:
+        """
+        Lê o atributo de um objeto já avaliado.
+        """
+        if type(obj_value) is LoxInstance:
+            # Campos da instância têm prioridade sobre os métodos
+            fields = obj_value.__dict__
+            if self.name in fields:
+                return fields[self.name]
+            method = self.find_method(obj_value)
+            if method is not None:
+                return method.bind(obj_value)
+
+        name = self.name
+        # Use getattr normal para os demais objetos
         try:
-            return getattr(obj_value, self.name)
+            return getattr(obj_value, name)
         except AttributeError:
-            raise AttributeError(f"O objeto {obj_value} não possui o atributo '{self.name}'")
+            raise AttributeError(f"O objeto {obj_value} não possui o atributo '{name}'")
 
-@dataclass
+    def find_method(self, obj_value: LoxInstance) -> LoxFunction | None:
+        """
+        Busca o método na classe da instância, usando o cache.
+
+        Retorna None para nomes definidos pela própria classe Python (ex.:
+        init), que são lidos com getattr e não podem ser cacheados.
+        """
+        klass = obj_value.klass
+        if klass is self._ic_class:
+            return self._ic_method
+
+        name = self.name
+        if hasattr(LoxInstance, name):
+            return None
+        try:
+            method = klass.get_method(name)
+        except LoxError:
+            raise AttributeError(f"O objeto {obj_value} não possui o atributo '{name}'")
+        self._ic_class = klass
+        self._ic_method = method
+        return method
+
+    def method_for(self, obj_value: Value) -> LoxFunction | None:
+        """
+        Retorna o método (ainda não vinculado) que seria lido por `get` ou
+        None se o atributo não for um método Lox da instância.
+        """
+        if type(obj_value) is LoxInstance and self.name not in obj_value.__dict__:
+            return self.find_method(obj_value)
+        return None
+
+@dataclass(slots=True)
 class Setattr(Expr):
     """Atribuição de atributo de um objeto."""
     obj: Expr
@@ -219,9 +573,17 @@ class Setattr(Expr):
     value: Expr
 
     def eval(self, ctx: Ctx):
-        obj_val = self.obj.eval(ctx)
-        val = self.value.eval(ctx)
-        
+        return self.set(self.obj.eval(ctx), self.value.eval(ctx))
+
+    def set(self, obj_val: Value, val: Value) -> Value:
+        """
+        Atribui o valor já avaliado ao atributo do objeto.
+        """
+        # Caso mais comum: escreve diretamente nos campos da instância
+        if type(obj_val) is LoxInstance:
+            obj_val.__dict__[self.name] = val
+            return val
+
         # Verificar se estamos tentando definir um campo numa classe ou função
         if isinstance(obj_val, (LoxClass, LoxFunction)):
             raise LoxError("Apenas instâncias podem ter campos.")
@@ -231,7 +593,7 @@ class Setattr(Expr):
 
 # COMANDOS
 
-@dataclass
+@dataclass(slots=True)
 class Print(Stmt):
     """Representa uma instrução de impressão."""
     expr: Expr
@@ -240,14 +602,30 @@ class Print(Stmt):
         value = self.expr.eval(ctx)
         lox_print(value)
 
-@dataclass
+@dataclass(slots=True)
+class PrintConst(Print):
+    """
+    Impressão de um literal.
+
+    O texto impresso não muda entre execuções e é calculado uma única vez.
+    """
+    expr: Literal
+    text: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.text = show(self.expr.value)
+
+    def eval(self, ctx: Ctx):
+        builtins.print(self.text)
+
+@dataclass(slots=True)
 class Return(Stmt):
     """Representa uma instrução de retorno."""
     value: Expr | None
 
     def eval(self, ctx: Ctx):
         return_value = self.value.eval(ctx) if self.value else None
-        raise LoxReturn(return_value)
+        return ReturnMarker(return_value)
 
     def validate_self(self, cursor: Cursor):
         """Verifica se return está dentro de uma função."""
@@ -267,7 +645,7 @@ class Return(Stmt):
             token="return"
         )
 
-@dataclass
+@dataclass(slots=True)
 class VarDef(Stmt):
     """Representa uma declaração de variável."""
     name: str
@@ -301,7 +679,7 @@ class VarDef(Stmt):
             if self.initializer:
                 self.initializer.visit({Var: check_self_reference})
 
-@dataclass
+@dataclass(slots=True)
 class If(Stmt):
     """Representa uma instrução condicional."""
     condition: Expr
@@ -311,32 +689,138 @@ class If(Stmt):
     def eval(self, ctx: Ctx):
         condition_val = self.condition.eval(ctx)
         if condition_val is not False and condition_val is not None:
-            self.then_branch.eval(ctx)
+            return self.then_branch.eval(ctx)
         else:
-            self.else_branch.eval(ctx)
+            return self.else_branch.eval(ctx)
 
-@dataclass
+class IfBool(If):
+    """
+    Condicional cuja condição sempre produz um booleano (ex.: comparações).
+
+    Nesse caso, a verdade da condição coincide com a do Python e não é
+    necessário compará-la com false e nil.
+    """
+    __slots__ = ()
+
+    def eval(self, ctx: Ctx):
+        if self.condition.eval(ctx):
+            return self.then_branch.eval(ctx)
+        else:
+            return self.else_branch.eval(ctx)
+
+@dataclass(slots=True)
 class While(Stmt):
     """Representa um laço de repetição."""
     condition: Expr
     body: Stmt
 
     def eval(self, ctx: Ctx):
+        # Os métodos são obtidos uma única vez, fora do laço
+        condition_eval = self.condition.eval
+        body_eval = self.body.eval
         while True:
-            condition_val = self.condition.eval(ctx)
+            condition_val = condition_eval(ctx)
             if condition_val is False or condition_val is None:
                 break
-            self.body.eval(ctx)
+            result = body_eval(ctx)
+            if result is not None:
+                return result
 
-@dataclass
+class WhileBool(While):
+    """
+    Laço cuja condição sempre produz um booleano, como em IfBool.
+    """
+    __slots__ = ()
+
+    def eval(self, ctx: Ctx):
+        condition_eval = self.condition.eval
+        body_eval = self.body.eval
+        while condition_eval(ctx):
+            result = body_eval(ctx)
+            if result is not None:
+                return result
+
+class WhileTrue(While):
+    """
+    Laço cuja condição é um literal verdadeiro (ex.: `for (;;)`), que não
+    precisa ser avaliada a cada iteração.
+    """
+    __slots__ = ()
+
+    def eval(self, ctx: Ctx):
+        body_eval = self.body.eval
+        while True:
+            result = body_eval(ctx)
+            if result is not None:
+                return result
+
+@dataclass(slots=True)
 class Block(Node):
-    """Representa um bloco de comandos."""
+    """
+    Representa um bloco de comandos.
+
+    Os contextos (e seus dicionários de escopo) são reaproveitados entre
+    execuções a partir de `Block.pool`. Isso só é seguro quando nenhuma função
+    ou classe é criada dentro do bloco, já que elas capturam o contexto. O
+    resolvedor marca esses blocos com `escapes=False`; blocos não resolvidos
+    escapam por precaução.
+
+    Os métodos `eval` dos comandos são salvos em uma tupla na primeira
+    execução, quando a árvore já passou por todas as transformações. Alterar
+    `stmts` depois disso exige limpar `_evals`.
+
+    Blocos com `scoped=False` não criam escopo. São usados pelo transformer
+    para agrupar comandos que não declaram variáveis, como o corpo e o
+    incremento de um laço 'for'.
+
+    A tradução do bloco para Python, quando ele é o corpo de uma função (ver
+    `lox.transpile`), fica em `_compiled`. `_transpiled` indica que a tradução
+    já foi tentada, já que `_compiled` é None para corpos não traduzidos.
+    """
     stmts: list[Stmt]
+    scoped: bool = field(default=True, repr=False, compare=False)
+    escapes: bool = field(default=True, init=False, repr=False, compare=False)
+    _evals: tuple | None = field(default=None, init=False, repr=False, compare=False)
+    _compiled: Callable | None = field(default=None, init=False, repr=False, compare=False)
+    _transpiled: bool = field(default=False, init=False, repr=False, compare=False)
+
+    pool: ClassVar[list[Ctx]] = []
 
     def eval(self, ctx: Ctx):
-        new_ctx = ctx.push({})
-        for stmt in self.stmts:
-            stmt.eval(new_ctx)
+        evals = self._evals
+        if evals is None:
+            evals = self._evals = tuple(stmt.eval for stmt in self.stmts)
+
+        if not self.scoped:
+            for stmt_eval in evals:
+                result = stmt_eval(ctx)
+                if result is not None:
+                    return result
+            return None
+
+        if self.escapes:
+            new_ctx = ctx.push({})
+            for stmt_eval in evals:
+                result = stmt_eval(new_ctx)
+                if result is not None:
+                    return result
+            return None
+
+        pool = Block.pool
+        if pool:
+            new_ctx = pool.pop()
+            new_ctx.parent = ctx
+        else:
+            new_ctx = ctx.push({})
+        try:
+            for stmt_eval in evals:
+                result = stmt_eval(new_ctx)
+                if result is not None:
+                    return result
+        finally:
+            new_ctx.scope.clear()
+            new_ctx.parent = None
+            pool.append(new_ctx)
 
     # Validação Semântica para Block
     def validate_self(self, cursor: Cursor):
@@ -351,16 +835,30 @@ class Block(Node):
                     )
                 seen.add(stmt.name)
 
-@dataclass
+@dataclass(slots=True)
 class Function(Stmt):
     """Representa uma declaração de função."""
     name: str
     params: list[Var]
     body: Block
+    # Marcada pelo resolvedor quando o resultado depende apenas dos argumentos
+    pure: bool = field(default=False, init=False, repr=False, compare=False)
+    _param_names: tuple[str, ...] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def param_names(self) -> tuple[str, ...]:
+        """
+        Nomes dos parâmetros, calculados uma única vez.
+        """
+        names = self._param_names
+        if names is None:
+            names = self._param_names = tuple(p.name for p in self.params if p is not None)
+        return names
 
     def eval(self, ctx: Ctx):
-        param_names = [p.name for p in self.params if p is not None]
-        function = LoxFunction(self.name, param_names, self.body, ctx)
+        memo = {} if self.pure else None
+        function = LoxFunction(self.name, self.param_names(), self.body, ctx, memo)
         ctx.var_def(self.name, function)
         return None
 
@@ -396,7 +894,7 @@ class Function(Stmt):
                         token=stmt.name
                     )
 
-@dataclass
+@dataclass(slots=True)
 class Method(Node):
     """Representa um método de classe."""
     name: str
@@ -406,12 +904,28 @@ class Method(Node):
     def eval(self, ctx: Ctx):
         pass
 
-@dataclass
+@dataclass(slots=True)
 class Class(Stmt):
     """Representa uma declaração de classe."""
     name: str
     methods: list[Method]
     superclass: str | None = None
+    _method_specs: tuple[tuple[str, tuple[str, ...], Block], ...] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def method_specs(self) -> tuple[tuple[str, tuple[str, ...], Block], ...]:
+        """
+        Tuplas (nome, parâmetros, corpo) de cada método, calculadas uma única
+        vez.
+        """
+        specs = self._method_specs
+        if specs is None:
+            specs = self._method_specs = tuple(
+                (m.name, tuple(p.name for p in m.params if p is not None), m.body)
+                for m in self.methods
+            )
+        return specs
 
     def eval(self, ctx: Ctx):
         # Carrega a superclasse, caso exista
@@ -431,10 +945,7 @@ class Class(Stmt):
 
         # Avaliamos cada método
         methods = {}
-        for method in self.methods:
-            method_name = method.name
-            method_body = method.body
-            method_args = [param.name for param in method.params if param is not None]
+        for method_name, method_args, method_body in self.method_specs():
             method_impl = LoxFunction(method_name, method_args, method_body, method_ctx)
             methods[method_name] = method_impl
 
@@ -448,4 +959,113 @@ class Class(Stmt):
             raise SemanticError(
                 "A class can't inherit from itself.",
                 token=self.superclass
-            )
\ No newline at end of file
+            )
+
+# OTIMIZAÇÕES
+
+def fold(node: Node) -> Node:
+    """
+    Dobra constantes: substitui subexpressões formadas apenas por literais pelo
+    valor resultante, de baixo para cima.
+
+    Retorna o nó que deve ocupar o lugar de `node`, que pode ser um novo
+    `Literal` ou o próprio nó. Operações que falhariam em tempo de execução
+    (ex.: "a" - 1) são preservadas para que o erro ocorra no momento certo.
+    """
+    for child in list(node.children()):
+        folded = fold(child)
+        if folded is not child:
+            node.replace_child(child, folded)
+
+    if isinstance(node, BinOp):
+        if isinstance(node.left, Literal) and isinstance(node.right, Literal):
+            try:
+                return Literal(node.op(node.left.value, node.right.value))
+            except LoxError:
+                return node
+    elif isinstance(node, UnaryOp):
+        if isinstance(node.operand, Literal):
+            try:
+                return Literal(node.op(node.operand.value))
+            except LoxError:
+                return node
+    elif isinstance(node, And):
+        if isinstance(node.left, Literal):
+            return node.right if truthy(node.left.value) else node.left
+    elif isinstance(node, Or):
+        if isinstance(node.left, Literal):
+            return node.left if truthy(node.left.value) else node.right
+    return node
+
+
+_CALLS_BY_ARITY: tuple[type[Call], ...] = (Call0, Call1, Call2, Call3)
+_NUMERIC_BINOPS: dict[Callable, type[BinOp]] = {
+    runtime.add: AddNum,
+    runtime.sub: SubNum,
+    runtime.mul: MulNum,
+    runtime.lt: LtNum,
+    runtime.le: LeNum,
+    runtime.gt: GtNum,
+    runtime.ge: GeNum,
+}
+_UNARY_OPS: dict[Callable, type[UnaryOp]] = {
+    runtime.neg: NegNum,
+    runtime.not_: Not,
+}
+_BOOL_OPS = {runtime.lt, runtime.le, runtime.gt, runtime.ge, runtime.eq, runtime.ne}
+
+def returns_bool(expr: Expr) -> bool:
+    """
+    Verifica se a expressão sempre produz um booleano.
+    """
+    if isinstance(expr, BinOp):
+        return expr.op in _BOOL_OPS
+    if isinstance(expr, UnaryOp):
+        return expr.op is runtime.not_
+    if isinstance(expr, Literal):
+        return type(expr.value) is bool
+    if isinstance(expr, (And, Or)):
+        return returns_bool(expr.left) and returns_bool(expr.right)
+    return False
+
+
+def specialize(node: Node) -> None:
+    """
+    Troca nós genéricos por versões especializadas com o mesmo conteúdo.
+
+    Chamadas de métodos passam a usar as classes Invoke e SuperInvoke, as
+    demais chamadas com até 3 argumentos passam a usar as classes Call0 a
+    Call3 e condicionais e laços com condições booleanas passam a usar IfBool
+    e WhileBool (ou WhileTrue, para condições sempre verdadeiras). Operações
+    aritméticas, comparações e negações ganham versões com caminho rápido
+    (AddNum, LtNum, NegNum, Not, etc).
+    """
+    for child in node.descendants():
+        if type(child) is Call and isinstance(child.callee, Getattr):
+            child.params = [p for p in child.params if p is not None]
+            child.__class__ = Invoke
+        elif type(child) is Call and isinstance(child.callee, Super):
+            child.params = [p for p in child.params if p is not None]
+            child.__class__ = SuperInvoke
+        elif type(child) is BinOp:
+            cls = _NUMERIC_BINOPS.get(child.op)
+            if cls is not None:
+                child.__class__ = cls
+        elif type(child) is UnaryOp:
+            cls = _UNARY_OPS.get(child.op)
+            if cls is not None:
+                child.__class__ = cls
+        elif type(child) is If:
+            if returns_bool(child.condition):
+                child.__class__ = IfBool
+        elif type(child) is While:
+            condition = child.condition
+            if type(condition) is Literal and truthy(condition.value):
+                child.__class__ = WhileTrue
+            elif returns_bool(condition):
+                child.__class__ = WhileBool
+        elif type(child) is Call:
+            params = [p for p in child.params if p is not None]
+            if len(params) < len(_CALLS_BY_ARITY):
+                child.params = params
+                child.__class__ = _CALLS_BY_ARITY[len(params)]
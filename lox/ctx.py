@@ -32,7 +32,7 @@ class _Builtins(dict):
 BUILTINS = _Builtins()
 
 
-@dataclass
+@dataclass(slots=True)
 class Ctx:
     """
     Contexto de execução. Por enquanto é só um dicionário que armazena nomes
@@ -76,6 +76,24 @@ class Ctx:
         """
         return name in self.scope or (self.parent is not None and name in self.parent)
 
+    def get_at(self, depth: int, name: str) -> "Value":
+        """
+        Obtém o valor de uma variável declarada `depth` escopos acima do atual.
+        """
+        ctx = self
+        for _ in range(depth):
+            ctx = ctx.parent  # type: ignore[assignment]
+        return ctx.scope[name]
+
+    def assign_at(self, depth: int, name: str, value: "Value") -> None:
+        """
+        Atribui o valor a uma variável declarada `depth` escopos acima do atual.
+        """
+        ctx = self
+        for _ in range(depth):
+            ctx = ctx.parent  # type: ignore[assignment]
+        ctx.scope[name] = value
+
     def var_def(self, name: str, value: "Value") -> None:
         """
         Define uma variável no contexto atual.
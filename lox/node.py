@@ -5,8 +5,8 @@ Define estrutura de dados básicas para as árvores sintáticas.
 """
 
 from abc import ABC
-from dataclasses import dataclass, field
-from functools import singledispatch
+from dataclasses import dataclass, field, fields, is_dataclass
+from functools import cache, singledispatch
 from types import BuiltinFunctionType, FunctionType, MethodDescriptorType, MethodType
 from typing import (
     TYPE_CHECKING,
@@ -36,8 +36,13 @@ class Node(ABC):
     O módulo `abc` é usado para criar uma classe abstrata. Isso significa que
     não podemos instanciar essa classe diretamente. Em vez disso, devemos
     criar subclasses que implementem os métodos abstratos definidos aqui.
+
+    Os nós não possuem `__dict__`: as subclasses declaram seus atributos como
+    campos de dataclasses com `slots=True`.
     """
 
+    __slots__ = ()
+
     def eval(self, ctx):
         name = type(self).__name__
         raise NotImplementedError(f"Método eval não implementado para {name}!")
@@ -61,7 +66,7 @@ class Node(ABC):
 
         Um nó é considerado uma folha se não tem filhos do tipo `Node`.
         """
-        for name in self.__annotations__:
+        for name in node_fields(self):
             value = getattr(self, name)
             if isinstance(value, (Node, list, tuple, dict)):
                 return False
@@ -87,10 +92,10 @@ class Node(ABC):
         # o nome da classe e um parêntese de abertura
         yield indent_level, str(self.__class__.__name__) + "("
 
-        # O attributo "__annotations__" é um dicionário que contém os nomes dos
-        # atributos declarados e seus tipos correspondentes. Vamos pegar os tipos
-        # na ordem de declaração e imprimir o nome e valores correspondentes
-        for attr in self.__annotations__:
+        # A função `node_fields` retorna os nomes dos atributos declarados na
+        # classe, na ordem de declaração. Vamos percorrer esses nomes e imprimir
+        # os valores correspondentes
+        for attr in node_fields(self):
             # attr é o nome do atributo. Obtemos o valor do atributo usando a
             # função `getattr` do Python
             value = getattr(self, attr)
@@ -159,7 +164,7 @@ class Node(ABC):
         """
 
         # Primeiro visitamos os filhos do nó atual.
-        for name in self.__annotations__:
+        for name in node_fields(self):
             value = getattr(self, name)
             if isinstance(value, Node):
                 value.visit(visitors)
@@ -183,7 +188,7 @@ class Node(ABC):
         do nó atual. Isso é útil para percorrer a árvore sintática de forma
         recursiva.
         """
-        for name in self.__annotations__:
+        for name in node_fields(self):
             value = getattr(self, name)
             if isinstance(value, Node):
                 yield value
@@ -203,7 +208,7 @@ class Node(ABC):
         método ajuda a encontrar nós não-tranformados que podem ter escapado seu
         Transformer.
         """
-        for name in self.__annotations__:
+        for name in node_fields(self):
             value = getattr(self, name)
             if isinstance(value, (Tree, Token)):
                 yield value
@@ -258,7 +263,7 @@ class Node(ABC):
         O método `replace_child` substitui um filho do nó atual por um novo
         nó. Isso é útil para modificar a árvore sintática de forma recursiva.
         """
-        for name in self.__annotations__:
+        for name in node_fields(self):
             value = getattr(self, name)
             if isinstance(value, Node):
                 if value is old:
@@ -491,6 +496,23 @@ def _(obj) -> str:
     return obj.__name__
 
 
+def node_fields(node: Node) -> tuple[str, ...]:
+    """
+    Retorna os nomes dos atributos que formam a estrutura do nó.
+
+    Campos declarados com `init=False` guardam informações internas (caches,
+    anotações de passos de compilação, etc) e não fazem parte da árvore.
+    """
+    return _fields_for_class(type(node))
+
+
+@cache
+def _fields_for_class(cls: type) -> tuple[str, ...]:
+    if is_dataclass(cls):
+        return tuple(f.name for f in fields(cls) if f.init)
+    return tuple(getattr(cls, "__annotations__", ()))
+
+
 def visit_once(obj: Node, visitors: dict[type[Node], Callable[[N], Any]]) -> None:
     """
     Visita um nó e executa a primeira função consistente com o tipo do objecto.
@@ -512,7 +534,7 @@ def can_print_as_leaf(node: Node) -> bool:
     """
     while node:
         args = []
-        for attr in node.__annotations__:
+        for attr in node_fields(node):
             obj = getattr(node, attr)
             if isinstance(obj, (list, tuple)) and obj:
                 return False
@@ -0,0 +1,209 @@
+"""
+Resolução de nomes de variáveis.
+
+O `Resolver` percorre a árvore sintática uma única vez e, para cada uso de uma
+variável local, calcula quantos escopos separam o uso da declaração. Essa
+distância é salva no atributo `depth` dos nós `Var`, `Assign`, `This` e
+`Super`, permitindo que a variável seja acessada diretamente com
+`Ctx.get_at(depth, name)` em vez de percorrer a cadeia de escopos comparando
+nomes.
+
+Variáveis que não são encontradas em nenhum escopo local (variáveis globais,
+funções nativas, variáveis definidas fora do programa, etc) ficam com
+`depth=None` e continuam sendo buscadas dinamicamente. O mesmo vale para
+usos que passam por um bloco que declara o nome mais adiante: até a
+declaração ser executada, o nome se refere a outra variável (ou a nenhuma).
+
+O resolvedor também marca os blocos que não criam funções nem classes
+(`Block.escapes=False`), cujos escopos podem ser reaproveitados, e as funções
+puras (`Function.pure=True`), cujos resultados podem ser guardados em cache.
+Uma função é pura quando só acessa os seus parâmetros e variáveis locais e
+não contém nenhum dos nós em `IMPURE_NODES`.
+
+Os escopos criados aqui devem espelhar exatamente os escopos criados em tempo
+de execução:
+
+* Blocos criam um escopo novo.
+* Chamadas de função criam um escopo para os parâmetros e o corpo da função
+  (um bloco) cria outro.
+* Métodos são executados dentro de um escopo com "this" e, se a classe possui
+  superclasse, de um escopo com "super" logo acima.
+"""
+
+from contextlib import contextmanager, nullcontext
+from typing import Iterator
+
+from .ast import (
+    Assign,
+    Block,
+    Call,
+    Class,
+    Function,
+    Getattr,
+    Node,
+    Print,
+    Setattr,
+    Super,
+    This,
+    Var,
+    VarDef,
+)
+
+# Nós que tornam impura a função que os contém: efeitos colaterais, chamadas
+# (que podem ter efeitos), objetos e closures (cuja identidade importa).
+IMPURE_NODES = (Print, Call, Getattr, Setattr, This, Super, Function, Class)
+
+
+class Resolver:
+    """
+    Calcula a profundidade das variáveis locais.
+
+    Cada tipo de nó com regras de escopo é tratado por um método
+    `resolve_<NomeDaClasse>`. Os demais nós apenas resolvem os filhos.
+    """
+
+    def __init__(self):
+        self.scopes: list[set[str]] = []
+        # Nomes que cada escopo ainda vai declarar
+        self.pending: list[set[str]] = []
+        # Funções em resolução: (nó, número de escopos fora da função)
+        self.functions: list[tuple[Function, int]] = []
+
+    def resolve(self, node: Node) -> None:
+        """
+        Resolve o nó e todos os seus descendentes.
+        """
+        if isinstance(node, IMPURE_NODES):
+            for function, _ in self.functions:
+                function.pure = False
+
+        method = getattr(self, f"resolve_{type(node).__name__}", None)
+        if method is not None:
+            method(node)
+        else:
+            for child in node.children():
+                self.resolve(child)
+
+    def declare(self, name: str) -> None:
+        """
+        Declara um nome no escopo mais interno.
+
+        No nível global os nomes não são registrados, pois são sempre buscados
+        dinamicamente.
+        """
+        if self.scopes:
+            self.scopes[-1].add(name)
+            self.pending[-1].discard(name)
+
+    def lookup(self, name: str) -> int | None:
+        """
+        Retorna a distância até o escopo onde o nome foi declarado ou None se
+        o nome não for local.
+        """
+        depth = self._lookup(name)
+
+        # Funções que acessam variáveis definidas fora delas não são puras
+        for function, outer in reversed(self.functions):
+            if depth is not None and depth < len(self.scopes) - outer:
+                break
+            function.pure = False
+        return depth
+
+    def _lookup(self, name: str) -> int | None:
+        for depth, (scope, pending) in enumerate(
+            zip(reversed(self.scopes), reversed(self.pending))
+        ):
+            if name in scope:
+                return depth
+            if name in pending:
+                return None
+        return None
+
+    @contextmanager
+    def scope(self, *names: str, pending: set[str] = frozenset()) -> Iterator[None]:
+        """
+        Cria um novo escopo com os nomes dados durante a execução do bloco with.
+
+        `pending` são os nomes que serão declarados no escopo mais adiante.
+        """
+        self.scopes.append(set(names))
+        self.pending.append(set(pending))
+        try:
+            yield
+        finally:
+            self.scopes.pop()
+            self.pending.pop()
+
+    def resolve_function(self, params: list[Var], body: Block) -> None:
+        """
+        Resolve o corpo de uma função ou método.
+        """
+        with self.scope(*(p.name for p in params if p is not None)):
+            self.resolve(body)
+
+    def resolve_Block(self, node: Block):
+        node.escapes = any(
+            isinstance(child, (Function, Class)) for child in node.descendants()
+        )
+        if not node.scoped:
+            for stmt in node.stmts:
+                self.resolve(stmt)
+            return
+        with self.scope(pending=declared_names(node.stmts)):
+            for stmt in node.stmts:
+                self.resolve(stmt)
+
+    def resolve_VarDef(self, node: VarDef):
+        self.resolve(node.initializer)
+        self.declare(node.name)
+
+    def resolve_Var(self, node: Var):
+        node.depth = self.lookup(node.name)
+
+    def resolve_Assign(self, node: Assign):
+        self.resolve(node.value)
+        node.depth = self.lookup(node.name)
+
+    def resolve_This(self, node: This):
+        node.depth = self.lookup("this")
+
+    def resolve_Super(self, node: Super):
+        node.depth = self.lookup("super")
+
+    def resolve_Function(self, node: Function):
+        # O nome é declarado antes do corpo para permitir recursão
+        self.declare(node.name)
+        node.pure = True
+        self.functions.append((node, len(self.scopes)))
+        try:
+            self.resolve_function(node.params, node.body)
+        finally:
+            self.functions.pop()
+
+    def resolve_Class(self, node: Class):
+        self.declare(node.name)
+        with self.scope("super") if node.superclass else nullcontext():
+            with self.scope("this"):
+                for method in node.methods:
+                    self.resolve_function(method.params, method.body)
+
+
+def declared_names(stmts: list[Node]) -> set[str]:
+    """
+    Nomes declarados diretamente pelos comandos, incluindo os de blocos que
+    não criam escopo.
+    """
+    names = set()
+    for stmt in stmts:
+        if isinstance(stmt, (VarDef, Function, Class)):
+            names.add(stmt.name)
+        elif isinstance(stmt, Block) and not stmt.scoped:
+            names |= declared_names(stmt.stmts)
+    return names
+
+
+def resolve(node: Node) -> None:
+    """
+    Anota as variáveis locais da árvore com suas profundidades.
+    """
+    Resolver().resolve(node)
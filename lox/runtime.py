@@ -1,7 +1,7 @@
 import builtins
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from types import BuiltinFunctionType, FunctionType
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable, Sequence
 
 from .ctx import Ctx
 
@@ -12,11 +12,29 @@ class LoxError(Exception):
     """Exceção para erros de execução Lox."""
 
 class LoxReturn(Exception):
-    """Exceção usada para implementar o comando 'return' do Lox."""
+    """
+    Exceção que encerra uma função Lox com um valor.
+
+    O comando 'return' usa `ReturnMarker`, que é mais barato. A exceção
+    continua disponível para funções implementadas em Python.
+    """
     def __init__(self, value: "Value"):
         super().__init__()
         self.value = value
 
+class ReturnMarker:
+    """
+    Resultado de um comando 'return'.
+
+    Os comandos retornam None ao terminar normalmente. Um 'return' cria um
+    `ReturnMarker`, que cada comando repassa ao seu chamador (blocos, laços,
+    condicionais) até chegar a `LoxFunction.call`, que extrai o valor.
+    """
+    __slots__ = ("value",)
+
+    def __init__(self, value: "Value"):
+        self.value = value
+
 @dataclass
 class LoxClass:
     """Representa uma classe Lox em tempo de execução."""
@@ -100,31 +118,91 @@ class LoxInstance:
 class LoxFunction:
     """Representa uma função Lox em tempo de execução."""
     name: str
-    params: list[str]
+    params: Sequence[str]
     body: "Block"
     ctx: Ctx
+    # Resultados já calculados, para funções puras (ver `Function.pure`).
+    # None desativa o cache.
+    memo: dict | None = field(default=None, repr=False)
+    # Versão traduzida para Python (ver `lox.transpile`), criada depois de
+    # HOT_CALLS chamadas.
+    compiled: Callable | None = field(default=None, repr=False)
+    calls: int = field(default=0, repr=False)
 
     def __str__(self) -> str:
         if self.name:
             return f"<fn {self.name}>"
         return "<fn>"
 
-    def call(self, args: list["Value"]):
+    def call(self, args: Sequence["Value"]):
         if len(args) != len(self.params):
             raise TypeError(f"'{self.name}' esperava {len(self.params)} argumentos, mas recebeu {len(args)}.")
-        
+
+        if self.memo is not None:
+            return self._call_memo(self.memo, args)
+        return self._run(args, self.ctx)
+
+    def call_bound(self, this: "Value", args: Sequence["Value"]):
+        """
+        Chama o método com o `this` dado. Equivale a `self.bind(this).call(args)`
+        sem criar a função vinculada.
+        """
+        if len(args) != len(self.params):
+            raise TypeError(f"'{self.name}' esperava {len(self.params)} argumentos, mas recebeu {len(args)}.")
+        return self._run(args, self.ctx.push({"this": this}))
+
+    def _run(self, args: Sequence["Value"], ctx: Ctx):
+        """
+        Executa o corpo da função com os argumentos já verificados, em um
+        escopo novo dentro de `ctx`.
+        """
+        compiled = self.compiled
+        if compiled is None:
+            self.calls += 1
+            if self.calls == HOT_CALLS:
+                from .transpile import transpile
+
+                compiled = self.compiled = transpile(self)
+        if compiled is not None:
+            try:
+                return compiled(ctx, *args)
+            except LoxReturn as ex:
+                return ex.value
+
         local_env = dict(zip(self.params, args))
-        call_ctx = self.ctx.push(local_env)
+        call_ctx = ctx.push(local_env)
 
         try:
-            self.body.eval(call_ctx)
+            result = self.body.eval(call_ctx)
         except LoxReturn as ex:
             return ex.value
-        
+
+        if result is not None:
+            return result.value
         return None
 
+    def _call_memo(self, memo: dict, args: Sequence["Value"]):
+        """
+        Chama uma função pura consultando o cache de resultados antes.
+
+        O cache guarda no máximo MEMO_SIZE resultados. Argumentos que não
+        podem ser usados como chave desativam o cache para aquela chamada.
+        """
+        try:
+            key = memo_key(args)
+            return memo[key]
+        except KeyError:
+            pass
+        except TypeError:
+            key = None
+
+        value = self._run(args, self.ctx)
+        if key is not None and len(memo) < MEMO_SIZE:
+            memo[key] = value
+        return value
+
     def __call__(self, *args):
-        return self.call(list(args))
+        return self.call(args)
 
     def bind(self, obj: "Value") -> "LoxFunction":
         """Associa essa função a um this específico."""
@@ -132,7 +210,8 @@ class LoxFunction:
             self.name,
             self.params,
             self.body,
-            self.ctx.push({"this": obj})
+            self.ctx.push({"this": obj}),
+            compiled=self.compiled,
         )
 
     def __eq__(self, other):
@@ -144,6 +223,21 @@ class LoxFunction:
         """Allow LoxFunction to be used in sets and as dict keys."""
         return id(self)
 
+MEMO_SIZE = 256
+
+# Número de chamadas a partir do qual a função é traduzida para Python
+HOT_CALLS = 10
+
+
+def memo_key(args: Sequence["Value"]) -> tuple:
+    """
+    Chave do cache de resultados de funções puras.
+
+    Os tipos fazem parte da chave, pois `true == 1` em Python, e números
+    usam `float.hex` para distinguir 0 de -0.
+    """
+    return tuple(a.hex() if type(a) is float else (type(a), a) for a in args)
+
 # --- Funções de Semântica do Lox ---
 
 def show(value: "Value") -> str:
@@ -154,6 +248,13 @@ def show(value: "Value") -> str:
         return "true"
     if value is False:
         return "false"
+    cls = type(value)
+    if cls is str:
+        return value
+    if cls is float and value and value.is_integer() and -1e16 < value < 1e16:
+        # Caso mais comum: inteiros são formatados sem passar pela parte
+        # fracionária. O zero fica no caso geral, que preserva o sinal de -0.
+        return str(int(value))
     if isinstance(value, float):
         # Dica: str(42.0) -> "42.0", removesuffix -> "42"
         return str(value).removesuffix('.0')
@@ -171,13 +272,11 @@ def truthy(value: "Value") -> bool:
     Avalia o valor de acordo com as regras de veracidade do Lox.
     Apenas 'nil' e 'false' são considerados falsos.
     """
-    if value is None or value is False:
-        return False
-    return True
+    return value is not None and value is not False
 
 def not_(value: "Value") -> bool:
     """Operador de negação Lox (!)."""
-    return not truthy(value)
+    return value is None or value is False
 
 def neg(value: "Value") -> float:
     """Operador de negação aritmética Lox (-)."""
@@ -265,5 +364,5 @@ __all__ = [
     "eq", "ne", "lt", "le", "gt", "ge",
     "neg", "not_",
     "truthy", "show", "print", "LoxError",
-    "LoxClass", "LoxInstance", "LoxFunction", "LoxReturn"
+    "LoxClass", "LoxInstance", "LoxFunction", "LoxReturn", "ReturnMarker"
 ]
\ No newline at end of file
@@ -7,6 +7,7 @@ A resolução de vários exercícios requer a modificação ou implementação d
 métodos desta classe.
 """
 
+import sys
 from typing import Callable
 from lark import Transformer, v_args
 
@@ -19,19 +20,53 @@ def op_handler(op: Callable):
     Fábrica de métodos que lidam com operações binárias na árvore sintática.
 
     Recebe a função que implementa a operação em tempo de execução.
+
+    Operações entre dois literais são calculadas imediatamente e viram um novo
+    `Literal`. Se a operação falhar (ex.: "a" - 1), o nó BinOp é mantido para
+    que o erro ocorra em tempo de execução.
+
+    A operação e as classes usadas são fixadas como argumentos padrão, que
+    são lidos como variáveis locais em cada chamada.
     """
 
-    def method(self, left, right):
-        return BinOp(left, right, op)
+    def method(self, left, right, *, _op=op, _Literal=Literal, _BinOp=BinOp):
+        if type(left) is _Literal and type(right) is _Literal:
+            try:
+                return _Literal(_op(left.value, right.value))
+            except LoxError:
+                pass
+        return _BinOp(left, right, _op)
 
     return method
 
 
+# Literais são imutáveis e podem ser compartilhados entre vários pontos da
+# árvore. Os literais de números e strings são guardados em caches limitados,
+# já que o transformer é reaproveitado entre programas.
+NIL = Literal(None)
+TRUE = Literal(True)
+FALSE = Literal(False)
+LITERAL_CACHE_SIZE = 1024
+
+
+def _string_value(token) -> str:
+    # O fatiamento já produz uma str comum. Strings curtas são internadas
+    text = token[1:-1]
+    return sys.intern(text) if len(text) <= 32 else text
+
+
 @v_args(inline=True)
 class LoxTransformer(Transformer):
-    # Programa
-    def program(self, *stmts):
-        return Program(list(stmts))
+    def __init__(self, visit_tokens: bool = True) -> None:
+        super().__init__(visit_tokens)
+        self._numbers: dict[str, Literal] = {}
+        self._strings: dict[str, Literal] = {}
+
+    # Programa. Regras com número variável de filhos recebem diretamente a
+    # lista criada pelo Lark, sem desempacotar em argumentos
+    @v_args(inline=False)
+    def program(self, stmts):
+        return Program(stmts)
 
     # Operações matemáticas básicas
     mul = op_handler(op.mul)
@@ -51,8 +86,10 @@ class LoxTransformer(Transformer):
     def call(self, callee: Expr, params=None):
         return Call(callee, params or [])
         
-    def params(self, *args):
-        return list(args)
+    @v_args(inline=False)
+    def params(self, args):
+        # Argumentos opcionais ausentes chegam como None
+        return [arg for arg in args if arg is not None]
 
     def getattr(self, obj, name):
         # Se o objeto é uma variável "super", trate como uma expressão Super especial
@@ -90,23 +127,29 @@ class LoxTransformer(Transformer):
     
     # Comandos e literais
     def print_cmd(self, expr):
+        if isinstance(expr, Literal):
+            return PrintConst(expr)
         return Print(expr)
 
     def var_decl(self, name, initializer=None):
         if initializer is None:
-            initializer = Literal(None)
+            initializer = NIL
         # Check if the name is actually a This node (when someone tries "var this = ...")
         if isinstance(name, This):
             from .errors import SemanticError
             raise SemanticError("Expect variable name.", token="this")
         return VarDef(name.name, initializer)
 
-    def block(self, *stmts):
-        return Block(list(stmts))
+    @v_args(inline=False)
+    def block(self, stmts):
+        return Block(stmts)
     
     def if_cmd(self, condition, then_branch, else_branch=None):
         if else_branch is None:
-            else_branch = Block([]) # Bloco vazio se não houver else
+            # Ramo 'else' ausente. Não declara nada e, portanto, não precisa
+            # de escopo. Cada 'if' recebe o seu bloco, já que os blocos
+            # guardam estado das etapas seguintes (resolvedor, caches, etc)
+            else_branch = Block([], scoped=False)
         return If(condition, then_branch, else_branch)
 
     def while_cmd(self, condition, body):
@@ -117,51 +160,65 @@ class LoxTransformer(Transformer):
 
     # Literais e Variáveis
     def VAR(self, token):
-        name = str(token)
+        # Nomes internados são comparados por identidade nos dicionários
+        name = sys.intern(str(token))
         if name == "this":
             return This()
         return Var(name)
 
     def NUMBER(self, token):
-        num = float(token)
-        return Literal(num)
-    
+        return self._cached_literal(self._numbers, token, float)
+
     def STRING(self, token):
-        text = str(token)[1:-1]
-        return Literal(text)
-    
+        return self._cached_literal(self._strings, token, _string_value)
+
     def NIL(self, _):
-        return Literal(None)
+        return NIL
 
     def BOOL(self, token):
-        return Literal(token == "true")
+        return TRUE if token == "true" else FALSE
+
+    def _cached_literal(self, cache: dict[str, Literal], token, convert) -> Literal:
+        # Tokens são strings e podem ser usados diretamente na busca. Só o
+        # texto é guardado no cache, para não manter o token vivo
+        try:
+            return cache[token]
+        except KeyError:
+            literal = Literal(convert(token))
+            if len(cache) < LITERAL_CACHE_SIZE:
+                cache[str(token)] = literal
+            return literal
 
     # Tratamento de 'for' (desugaring para 'while')
     def empty_init(self):
         return None 
 
     def empty_cond(self):
-        return Literal(True)
+        return TRUE
 
     def empty_incr(self):
         return None
 
     def for_cmd(self, init, cond, incr, body):
-        # Constrói o corpo do while
-        while_body = [body]
-        if incr is not None:
-            while_body.append(ExprStmt(incr))
-        
-        # Constrói o laço while
         if cond is None:
-            cond = Literal(True)
-        loop = While(cond, Block(while_body))
+            cond = TRUE
 
-        # Adiciona o inicializador, se existir
-        if init is not None:
-            return Block([init, loop])
-        
-        return loop
+        # Constrói o laço while. O bloco que junta corpo e incremento não
+        # declara variáveis e, portanto, não precisa de um escopo próprio.
+        # Sem incremento, o corpo é usado diretamente.
+        if incr is None:
+            loop = While(cond, body)
+        else:
+            loop = While(cond, Block([body, ExprStmt(incr)], scoped=False))
+
+        # Adiciona o inicializador, se existir. Inicializadores que são
+        # expressões viram comandos, já que o valor de um comando é tratado
+        # como o resultado de um 'return'
+        if init is None:
+            return loop
+        if type(init) is not VarDef:
+            init = ExprStmt(init)
+        return Block([init, loop])
     
     # Funções e retornos
     def return_stmt(self, value=None):
@@ -170,8 +227,9 @@ class LoxTransformer(Transformer):
     def function_declaration(self, name, params, body):
         return Function(name.name, params or [], body)
 
-    def fun_params(self, *params):
-        return list(params)
+    @v_args(inline=False)
+    def fun_params(self, params):
+        return params
     
     def this(self, _):
         return This()
@@ -194,10 +252,4 @@ class LoxTransformer(Transformer):
         return Class(name.name, methods, superclass)
 
     def method_declaration(self, name, params, body):
-        return Method(name.name, params or [], body)
-
-    def function_declaration(self, name, params, body):
-        return Function(name.name, params or [], body)
-
-    def fun_params(self, *params):
-        return list(params)
\ No newline at end of file
+        return Method(name.name, params or [], body)
\ No newline at end of file
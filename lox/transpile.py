@@ -0,0 +1,403 @@
+"""
+Tradução de funções Lox para funções Python.
+
+Funções chamadas muitas vezes (ver `runtime.HOT_CALLS`) têm o corpo traduzido
+para código Python, compilado com `compile()`. As variáveis locais da função
+viram variáveis locais do Python e as operações numéricas viram operações
+nativas, com a mesma verificação de tipos feita pelos nós especializados:
+
+    fun soma(a, b) { return a + b; }
+
+vira, aproximadamente,
+
+    def soma(ctx, l0_a, l1_b):
+        return (t0 + t1 if type(t0 := l0_a) is type(t1 := l1_b) is float
+                else _add(t0, t1))
+
+A função gerada recebe o contexto em que a função Lox foi criada, usado para
+as variáveis livres (globais, closures e `this`), seguido dos argumentos.
+
+A tradução é conservadora: funções que criam funções ou classes ou contêm
+qualquer outro nó não suportado continuam sendo executadas pelo interpretador
+de árvore.
+"""
+
+import builtins
+from typing import Callable
+
+from . import runtime
+from .ast import (
+    And,
+    Assign,
+    BinOp,
+    Block,
+    Call,
+    Expr,
+    ExprStmt,
+    Getattr,
+    If,
+    IfBool,
+    Invoke,
+    Literal,
+    Or,
+    Print,
+    PrintConst,
+    Return,
+    Setattr,
+    Stmt,
+    Super,
+    SuperInvoke,
+    This,
+    UnaryOp,
+    Var,
+    VarDef,
+    While,
+    WhileBool,
+    WhileTrue,
+    _check_callable,
+)
+from .ctx import Ctx
+from .runtime import LoxFunction
+
+# Operações com caminho rápido para dois números
+_NUMERIC_OPS: dict[Callable, str] = {
+    runtime.add: "+",
+    runtime.sub: "-",
+    runtime.mul: "*",
+    runtime.lt: "<",
+    runtime.le: "<=",
+    runtime.gt: ">",
+    runtime.ge: ">=",
+}
+
+class Unsupported(Exception):
+    """O corpo da função contém um nó que não é traduzido."""
+
+
+def transpile(func: LoxFunction) -> Callable | None:
+    """
+    Traduz o corpo da função para uma função Python.
+
+    A função gerada recebe o contexto de definição e os argumentos e retorna o
+    valor de retorno da função Lox. Retorna None se a função não puder ser
+    traduzida.
+
+    O resultado é guardado no corpo da função, que é compartilhado por todas
+    as closures criadas a partir da mesma declaração.
+    """
+    body = func.body
+    if body._transpiled:
+        return body._compiled
+
+    try:
+        compiled = Transpiler().function(func.name, func.params, body)
+    except (Unsupported, SyntaxError):
+        # Código gerado inválido também volta para o interpretador de árvore
+        compiled = None
+    body._compiled = compiled
+    body._transpiled = True
+    return compiled
+
+
+# Funções auxiliares usadas pelo código gerado
+
+def _load(ctx: Ctx, name: str):
+    try:
+        return ctx[name]
+    except KeyError:
+        raise NameError(f"variável {name} não existe!")
+
+
+def _load_at(ctx: Ctx, depth: int, name: str):
+    try:
+        return ctx.get_at(depth, name)
+    except KeyError:
+        raise NameError(f"variável {name} não existe!")
+
+
+def _assign(ctx: Ctx, name: str, value):
+    ctx.assign(name, value)
+    return value
+
+
+def _assign_at(ctx: Ctx, depth: int, name: str, value):
+    ctx.assign_at(depth, name, value)
+    return value
+
+
+def _call(func, *args):
+    if type(func) is LoxFunction:
+        return func.call(args)
+    try:
+        return func(*args)
+    except TypeError:
+        _check_callable(func)
+        raise
+
+
+def _getmethod(node: Getattr, obj):
+    method = node.method_for(obj)
+    if method is None:
+        return node.get(obj), None
+    return method, obj
+
+
+def _invoke(pair: tuple, *args):
+    func, this = pair
+    if this is not None:
+        return func.call_bound(this, args)
+    return _call(func, *args)
+
+
+def _super(node: Super, super_class, this):
+    return node.find(super_class).bind(this)
+
+
+def _super_invoke(node: Super, super_class, this, *args):
+    return node.find(super_class).call_bound(this, args)
+
+
+_HELPERS = {
+    "_load": _load,
+    "_load_at": _load_at,
+    "_assign": _assign,
+    "_assign_at": _assign_at,
+    "_call": _call,
+    "_getmethod": _getmethod,
+    "_invoke": _invoke,
+    "_super": _super,
+    "_super_invoke": _super_invoke,
+    "_print": runtime.print,
+    "_bprint": builtins.print,
+}
+
+
+class Transpiler:
+    """
+    Gera o código Python de uma função Lox.
+
+    As variáveis declaradas na função recebem nomes Python únicos (l0_x,
+    l1_y, ...), de modo que o sombreamento entre blocos é preservado. Os
+    valores intermediários usam os nomes t0, t1, ... e os objetos externos
+    (operações, nós da árvore) são passados como globais _g0, _g1, ...
+    """
+
+    def __init__(self) -> None:
+        self.lines: list[str] = []
+        self.globals: dict[str, object] = dict(_HELPERS)
+        self._global_names: dict[int, str] = {}
+        self.scopes: list[dict[str, str]] = []
+        self.n_locals = 0
+        self.n_temps = 0
+        # Quantidade de escopos Lox entre o código atual e o contexto de
+        # definição da função (parâmetros + blocos)
+        self.depth = 0
+
+    def function(self, name: str, params, body: Block) -> Callable:
+        if len(set(params)) != len(params):
+            raise Unsupported("parâmetros repetidos")
+
+        self.scopes.append({})
+        self.depth = 1
+        args = ", ".join(self.declare(param) for param in params)
+        self.lines.append(f"def _lox_fn(ctx, {args}):" if args else "def _lox_fn(ctx):")
+        self.block(body, 1)
+        self.lines.append("    return None")
+
+        src = "\n".join(self.lines)
+        namespace: dict = {}
+        exec(compile(src, f"<lox {name}>", "exec"), self.globals, namespace)
+        compiled = namespace["_lox_fn"]
+        compiled.__qualname__ = compiled.__name__ = name or "_lox_fn"
+        return compiled
+
+    # Nomes
+
+    def declare(self, name: str) -> str:
+        scope = self.scopes[-1]
+        if name in scope:
+            raise Unsupported(f"variável {name} declarada duas vezes")
+        # Nomes Lox aceitam letras que não são válidas em identificadores
+        # Python (ex.: "a²"). O contador já garante nomes únicos, e o nome Lox
+        # só é mantido, para facilitar a leitura, quando é ASCII.
+        if name.isascii():
+            py_name = f"l{self.n_locals}_{name}"
+        else:
+            py_name = f"l{self.n_locals}"
+        scope[name] = py_name
+        self.n_locals += 1
+        return py_name
+
+    def local(self, name: str) -> str | None:
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+    def temp(self) -> str:
+        name = f"t{self.n_temps}"
+        self.n_temps += 1
+        return name
+
+    def ref(self, obj: object) -> str:
+        """Expõe um objeto externo ao código gerado como variável global."""
+        key = id(obj)
+        if key not in self._global_names:
+            name = self._global_names[key] = f"_g{len(self._global_names)}"
+            self.globals[name] = obj
+        return self._global_names[key]
+
+    def free_depth(self, depth: int) -> int:
+        """Converte a profundidade do resolver para o contexto de definição."""
+        return depth - self.depth
+
+    # Comandos
+
+    def emit(self, line: str, indent: int) -> None:
+        self.lines.append("    " * indent + line)
+
+    def block(self, node: Block, indent: int) -> None:
+        if type(node) is not Block:
+            raise Unsupported(type(node).__name__)
+        if node.scoped:
+            self.scopes.append({})
+            self.depth += 1
+        start = len(self.lines)
+        for stmt in node.stmts:
+            self.stmt(stmt, indent)
+        if len(self.lines) == start:
+            self.emit("pass", indent)
+        if node.scoped:
+            self.depth -= 1
+            self.scopes.pop()
+
+    def stmt(self, node: Stmt, indent: int) -> None:
+        cls = type(node)
+        if cls is Block:
+            self.block(node, indent)
+        elif cls is ExprStmt:
+            self.emit(self.expr(node.expr), indent)
+        elif cls is PrintConst:
+            self.emit(f"_bprint({node.text!r})", indent)
+        elif cls is Print:
+            self.emit(f"_print({self.expr(node.expr)})", indent)
+        elif cls is VarDef:
+            value = self.expr(node.initializer)
+            self.emit(f"{self.declare(node.name)} = {value}", indent)
+        elif cls is Return:
+            value = "None" if node.value is None else self.expr(node.value)
+            self.emit(f"return {value}", indent)
+        elif cls is If or cls is IfBool:
+            cond = self.expr(node.condition) if cls is IfBool else self.test(node.condition)
+            self.emit(f"if {cond}:", indent)
+            self.stmt(node.then_branch, indent + 1)
+            else_branch = node.else_branch
+            if not (type(else_branch) is Block and not else_branch.stmts):
+                self.emit("else:", indent)
+                self.stmt(else_branch, indent + 1)
+        elif cls is While or cls is WhileBool or cls is WhileTrue:
+            cond = self.expr(node.condition) if cls is WhileBool else self.test(node.condition)
+            self.emit(f"while {cond}:", indent)
+            self.stmt(node.body, indent + 1)
+        else:
+            raise Unsupported(cls.__name__)
+
+    # Expressões
+
+    def test(self, node: Expr) -> str:
+        """Condição Python equivalente à veracidade Lox da expressão."""
+        if type(node) is Literal:
+            return repr(runtime.truthy(node.value))
+        t = self.temp()
+        return f"(({t} := {self.expr(node)}) is not None and {t} is not False)"
+
+    def expr(self, node: Expr) -> str:
+        cls = type(node)
+        if cls is Literal:
+            return self.literal(node.value)
+        if cls is Var:
+            return self.var(node)
+        if cls is This:
+            if node.depth is None:
+                return "_load(ctx, 'this')"
+            return f"_load_at(ctx, {self.free_depth(node.depth)}, 'this')"
+        if cls is Assign:
+            value = self.expr(node.value)
+            py_name = self.local(node.name)
+            if py_name is not None:
+                return f"({py_name} := {value})"
+            if node.depth is None:
+                return f"_assign(ctx, {node.name!r}, {value})"
+            return f"_assign_at(ctx, {self.free_depth(node.depth)}, {node.name!r}, {value})"
+        if isinstance(node, UnaryOp):
+            operand = self.expr(node.operand)
+            t = self.temp()
+            if node.op is runtime.not_:
+                return f"(({t} := {operand}) is None or {t} is False)"
+            if node.op is runtime.neg:
+                return f"(-{t} if type({t} := {operand}) is float else {self.ref(node.op)}({t}))"
+            return f"{self.ref(node.op)}({operand})"
+        if cls is And or cls is Or:
+            t = self.temp()
+            left = self.expr(node.left)
+            right = self.expr(node.right)
+            falsy = f"({t} := {left}) is None or {t} is False"
+            if cls is And:
+                return f"({t} if {falsy} else {right})"
+            return f"({right} if {falsy} else {t})"
+        if isinstance(node, Invoke):
+            pair = f"_getmethod({self.ref(node.callee)}, {self.expr(node.callee.obj)})"
+            return f"_invoke({', '.join([pair, *map(self.expr, node.params)])})"
+        if cls is Super:
+            return f"_super({self.super_args(node)})"
+        if cls is SuperInvoke:
+            args = [self.super_args(node.callee), *map(self.expr, node.params)]
+            return f"_super_invoke({', '.join(args)})"
+        if isinstance(node, Call):
+            args = [self.expr(param) for param in node.params if param is not None]
+            return f"_call({', '.join([self.expr(node.callee), *args])})"
+        if cls is Getattr:
+            return f"{self.ref(node)}.get({self.expr(node.obj)})"
+        if cls is Setattr:
+            return f"{self.ref(node)}.set({self.expr(node.obj)}, {self.expr(node.value)})"
+        if isinstance(node, BinOp):
+            return self.binop(node)
+        raise Unsupported(cls.__name__)
+
+    def super_args(self, node: Super) -> str:
+        if node.depth is None:
+            load_super, load_this = "_load(ctx, 'super')", "_load(ctx, 'this')"
+        else:
+            depth = self.free_depth(node.depth)
+            load_super = f"_load_at(ctx, {depth}, 'super')"
+            load_this = f"_load_at(ctx, {depth - 1}, 'this')"
+        return f"{self.ref(node)}, {load_super}, {load_this}"
+
+    def literal(self, value) -> str:
+        if value is None or type(value) in (bool, str):
+            return repr(value)
+        if type(value) is float and value - value == 0.0:
+            return repr(value)
+        return self.ref(value)
+
+    def var(self, node: Var) -> str:
+        py_name = self.local(node.name)
+        if py_name is not None:
+            return py_name
+        if node.depth is None:
+            return f"_load(ctx, {node.name!r})"
+        return f"_load_at(ctx, {self.free_depth(node.depth)}, {node.name!r})"
+
+    def binop(self, node: BinOp) -> str:
+        left = self.expr(node.left)
+        right = self.expr(node.right)
+        op = self.ref(node.op)
+        symbol = _NUMERIC_OPS.get(node.op)
+        if symbol is None:
+            return f"{op}({left}, {right})"
+        a, b = self.temp(), self.temp()
+        return (
+            f"({a} {symbol} {b} if type({a} := {left}) is type({b} := {right}) is float"
+            f" else {op}({a}, {b}))"
+        )
+
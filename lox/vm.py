@@ -0,0 +1,801 @@
+"""
+Máquina virtual de bytecode para o Lox.
+
+Em vez de percorrer a árvore sintática chamando o método `eval` de cada nó, o
+`Compiler` converte a árvore em uma sequência linear de instruções que é
+executada por um único laço em `VM.run`. Isso elimina uma chamada de método
+Python por nó avaliado.
+
+Cada instrução da lista `Code.ops` é uma dupla com o código da operação e o
+seu argumento (0 quando a operação não usa argumentos). Os valores
+constantes e os nomes de variáveis são guardados nas listas `Code.consts` e
+`Code.names`, respectivamente, e as instruções se referem a eles pelo índice.
+
+Nós que ainda não possuem uma tradução para bytecode são executados pelo
+interpretador de árvore (instruções OP_EVAL e OP_EXEC).
+"""
+
+import builtins
+from dataclasses import dataclass, field
+from math import copysign
+from typing import Callable
+
+from .ast import Assign, Block, Expr, Literal, Node, _check_callable
+from .ctx import Ctx
+from . import runtime
+from .runtime import LoxFunction, print as lox_print, show, truthy
+
+# Operações da máquina virtual
+OP_CONST = 0  # empilha consts[arg]
+OP_LOAD = 1  # empilha o valor da variável names[arg]
+OP_ASSIGN = 2  # atribui o topo da pilha à variável names[arg] (mantém o valor)
+OP_DEFINE = 3  # declara a variável names[arg] com o valor desempilhado
+OP_POP = 4  # descarta o topo da pilha
+OP_BINOP = 5  # aplica consts[arg] aos dois valores no topo da pilha
+OP_UNARY = 6  # aplica consts[arg] ao valor no topo da pilha
+OP_JUMP = 7  # salta para a posição arg
+OP_JUMP_IF_FALSE = 8  # desempilha e salta para arg caso o valor seja falso
+OP_JUMP_IF_FALSE_OR_POP = 9  # salta mantendo o valor se falso, senão desempilha
+OP_JUMP_IF_TRUE_OR_POP = 10  # salta mantendo o valor se verdadeiro, senão desempilha
+OP_CALL = 11  # chama uma função com arg argumentos
+OP_PRINT = 12  # desempilha e imprime o valor
+OP_PUSH_SCOPE = 13  # cria um novo contexto (reaproveitado do Block.pool se arg=1)
+OP_POP_SCOPE = 14  # descarta o contexto mais interno (devolvendo-o ao pool se arg=1)
+OP_EVAL = 15  # avalia a expressão consts[arg] com o interpretador de árvore
+OP_EXEC = 16  # executa o comando consts[arg] com o interpretador de árvore
+OP_STORE = 17  # desempilha e atribui o valor à variável names[arg]
+OP_LOAD_AT = 18  # como OP_LOAD, para a variável local consts[arg] = (depth, name)
+OP_ASSIGN_AT = 19  # como OP_ASSIGN, para a variável local consts[arg]
+OP_STORE_AT = 20  # como OP_STORE, para a variável local consts[arg]
+
+# Versões de OP_BINOP com caminho rápido para dois números. Nos demais casos,
+# aplicam a função consts[arg], como OP_BINOP.
+OP_ADD = 21
+OP_SUB = 22
+OP_MUL = 23
+OP_LT = 24
+OP_LE = 25
+OP_GT = 26
+OP_GE = 27
+
+OP_GETATTR = 28  # substitui o objeto no topo pelo atributo lido por consts[arg]
+OP_SETATTR = 29  # atribui o valor no topo ao objeto abaixo dele via consts[arg]
+OP_PRINT_CONST = 30  # imprime o texto consts[arg], sem usar a pilha
+# Chamadas de método: OP_GETMETHOD troca o objeto no topo pelo par (método,
+# this) ou, se o atributo não for um método Lox, por (valor, None). OP_INVOKE
+# chama o par com arg argumentos, sem criar a função vinculada.
+OP_GETMETHOD = 31
+OP_INVOKE = 32
+
+
+@dataclass
+class Code:
+    """
+    Resultado da compilação de um nó: instruções, constantes e nomes.
+    """
+
+    ops: list[tuple[int, int]] = field(default_factory=list)
+    consts: list = field(default_factory=list)
+    names: list[str] = field(default_factory=list)
+
+
+class Compiler:
+    """
+    Compila nós da árvore sintática para bytecode.
+
+    Cada tipo de nó é tratado por um método `emit_<NomeDaClasse>`, de modo
+    similar ao que o `LoxTransformer` faz com as regras da gramática. Nós sem
+    método correspondente são delegados ao interpretador de árvore.
+    """
+
+    def __init__(self):
+        self.code = Code()
+        self._name_index: dict[str, int] = {}
+        self._const_index: dict[tuple, int] = {}
+
+    def compile(self, node: Node) -> Code:
+        """
+        Compila o nó e retorna o código resultante.
+        """
+        self.emit_node(node)
+        return self.code
+
+    def emit(self, op: int, arg: int = 0) -> int:
+        """
+        Adiciona uma instrução e retorna a sua posição.
+        """
+        ops = self.code.ops
+        ops.append((op, arg))
+        return len(ops) - 1
+
+    def emit_jump(self, op: int) -> int:
+        """
+        Emite um salto cujo destino será definido posteriormente por `patch`.
+        """
+        return self.emit(op, -1)
+
+    def patch(self, pos: int) -> None:
+        """
+        Faz o salto na posição `pos` apontar para a próxima instrução.
+        """
+        op, _ = self.code.ops[pos]
+        self.code.ops[pos] = (op, len(self.code.ops))
+
+    def const(self, value) -> int:
+        """
+        Registra uma constante e retorna o seu índice.
+
+        Constantes iguais e do mesmo tipo compartilham a mesma entrada, de
+        modo que todas as instruções reutilizam o mesmo objeto já criado. O
+        tipo faz parte da chave para não confundir valores como `true` e `1` e,
+        no caso de números, o sinal também, pois `0 == -0`.
+        Valores que não podem ser usados como chave (ex.: nós da árvore) são
+        sempre registrados em uma entrada nova.
+        """
+        consts = self.code.consts
+        key = (type(value), value, copysign(1.0, value) if type(value) is float else 0)
+        try:
+            return self._const_index[key]
+        except KeyError:
+            consts.append(value)
+            idx = self._const_index[key] = len(consts) - 1
+            return idx
+        except TypeError:
+            consts.append(value)
+            return len(consts) - 1
+
+    def name(self, name: str) -> int:
+        """
+        Registra um nome de variável e retorna o seu índice.
+        """
+        try:
+            return self._name_index[name]
+        except KeyError:
+            self.code.names.append(name)
+            idx = self._name_index[name] = len(self.code.names) - 1
+            return idx
+
+    def emit_node(self, node: Node) -> None:
+        """
+        Emite o código para um nó qualquer.
+        """
+        cls = type(node)
+        try:
+            emitter = _EMITTERS[cls]
+        except KeyError:
+            emitter = _EMITTERS[cls] = _find_emitter(cls)
+        emitter(self, node)
+
+    def emit_fallback(self, node: Node) -> None:
+        """
+        Delega o nó ao interpretador de árvore.
+        """
+        if isinstance(node, Expr):
+            self.emit(OP_EVAL, self.const(node))
+        else:
+            self.emit(OP_EXEC, self.const(node))
+
+    # Comandos
+    def emit_Program(self, node):
+        for stmt in node.stmts:
+            self.emit_node(stmt)
+
+    def emit_Block(self, node):
+        if not node.scoped:
+            for stmt in node.stmts:
+                self.emit_node(stmt)
+            return
+        pooled = int(not node.escapes)
+        self.emit(OP_PUSH_SCOPE, pooled)
+        for stmt in node.stmts:
+            self.emit_node(stmt)
+        self.emit(OP_POP_SCOPE, pooled)
+
+    def emit_ExprStmt(self, node):
+        # Atribuições usadas como comandos não precisam deixar o valor na pilha
+        expr = node.expr
+        if isinstance(expr, Assign):
+            self.emit_node(expr.value)
+            if expr.depth is None:
+                self.emit(OP_STORE, self.name(expr.name))
+            else:
+                self.emit(OP_STORE_AT, self.const((expr.depth, expr.name)))
+        else:
+            self.emit_node(expr)
+            self.emit(OP_POP)
+
+    def emit_Print(self, node):
+        # Literais (inclusive os produzidos por `fold`) já têm o texto pronto
+        if isinstance(node.expr, Literal):
+            self.emit(OP_PRINT_CONST, self.const(show(node.expr.value)))
+        else:
+            self.emit_node(node.expr)
+            self.emit(OP_PRINT)
+
+    def emit_VarDef(self, node):
+        self.emit_node(node.initializer)
+        self.emit(OP_DEFINE, self.name(node.name))
+
+    def emit_If(self, node):
+        self.emit_node(node.condition)
+        to_else = self.emit_jump(OP_JUMP_IF_FALSE)
+        self.emit_node(node.then_branch)
+        to_end = self.emit_jump(OP_JUMP)
+        self.patch(to_else)
+        self.emit_node(node.else_branch)
+        self.patch(to_end)
+
+    def emit_While(self, node):
+        start = len(self.code.ops)
+        condition = node.condition
+        if isinstance(condition, Literal) and truthy(condition.value):
+            # Laço infinito: a condição não precisa ser testada
+            self.emit_node(node.body)
+            self.emit(OP_JUMP, start)
+            return
+        self.emit_node(condition)
+        to_end = self.emit_jump(OP_JUMP_IF_FALSE)
+        self.emit_node(node.body)
+        self.emit(OP_JUMP, start)
+        self.patch(to_end)
+
+    # Expressões
+    def emit_Literal(self, node):
+        self.emit(OP_CONST, self.const(node.value))
+
+    def emit_Var(self, node):
+        if node.depth is None:
+            self.emit(OP_LOAD, self.name(node.name))
+        else:
+            self.emit(OP_LOAD_AT, self.const((node.depth, node.name)))
+
+    def emit_This(self, node):
+        if node.depth is None:
+            self.emit(OP_LOAD, self.name("this"))
+        else:
+            self.emit(OP_LOAD_AT, self.const((node.depth, "this")))
+
+    def emit_Getattr(self, node):
+        self.emit_node(node.obj)
+        self.emit(OP_GETATTR, self.const(node))
+
+    def emit_Setattr(self, node):
+        self.emit_node(node.obj)
+        self.emit_node(node.value)
+        self.emit(OP_SETATTR, self.const(node))
+
+    def emit_Assign(self, node):
+        self.emit_node(node.value)
+        if node.depth is None:
+            self.emit(OP_ASSIGN, self.name(node.name))
+        else:
+            self.emit(OP_ASSIGN_AT, self.const((node.depth, node.name)))
+
+    def emit_BinOp(self, node):
+        self.emit_node(node.left)
+        self.emit_node(node.right)
+        self.emit(_NUMERIC_BINOPS.get(node.op, OP_BINOP), self.const(node.op))
+
+    def emit_UnaryOp(self, node):
+        self.emit_node(node.operand)
+        self.emit(OP_UNARY, self.const(node.op))
+
+    def emit_And(self, node):
+        self.emit_node(node.left)
+        to_end = self.emit_jump(OP_JUMP_IF_FALSE_OR_POP)
+        self.emit_node(node.right)
+        self.patch(to_end)
+
+    def emit_Or(self, node):
+        self.emit_node(node.left)
+        to_end = self.emit_jump(OP_JUMP_IF_TRUE_OR_POP)
+        self.emit_node(node.right)
+        self.patch(to_end)
+
+    def emit_Call(self, node):
+        self.emit_node(node.callee)
+        n_args = 0
+        for param in node.params:
+            if param is not None:
+                self.emit_node(param)
+                n_args += 1
+        self.emit(OP_CALL, n_args)
+
+    def emit_Invoke(self, node):
+        self.emit_node(node.callee.obj)
+        self.emit(OP_GETMETHOD, self.const(node.callee))
+        for param in node.params:
+            self.emit_node(param)
+        self.emit(OP_INVOKE, len(node.params))
+
+
+_NUMERIC_BINOPS: dict[Callable, int] = {
+    runtime.add: OP_ADD,
+    runtime.sub: OP_SUB,
+    runtime.mul: OP_MUL,
+    runtime.lt: OP_LT,
+    runtime.le: OP_LE,
+    runtime.gt: OP_GT,
+    runtime.ge: OP_GE,
+}
+
+# Tabela de despacho: classe do nó -> método `emit_*` que a compila
+_EMITTERS: dict[type, Callable[[Compiler, Node], None]] = {}
+
+
+def _find_emitter(cls: type) -> Callable[[Compiler, Node], None]:
+    """
+    Busca o método da classe mais próxima na hierarquia, de modo que versões
+    especializadas de um nó reaproveitam o método do nó base.
+    """
+    for base in cls.__mro__:
+        method = getattr(Compiler, f"emit_{base.__name__}", None)
+        if method is not None:
+            return method
+    return Compiler.emit_fallback
+
+
+class VM:
+    """
+    Executa o código produzido pelo `Compiler`.
+
+    Antes da execução, cada instrução é convertida em uma função sem
+    argumentos (handler) que já tem acesso ao seu argumento, às constantes e
+    à pilha, e que retorna a posição da próxima instrução. O laço principal
+    se reduz a `ip = handlers[ip]()`: uma única chamada indireta por
+    instrução, sem a cadeia de comparações com o código da operação. É o
+    análogo em Python do "direct threading" de máquinas virtuais em C.
+    """
+
+    def __init__(self, code: Code):
+        self.code = code
+
+    def run(self, ctx: Ctx) -> None:
+        consts = self.code.consts
+        names = self.code.names
+        stack: list = []
+        push = stack.append
+        pop = stack.pop
+        pool = Block.pool
+
+        # Fábricas de handlers: recebem o argumento da instrução e a posição
+        # da instrução seguinte. A variável `ctx` é compartilhada por todos
+        # os handlers e só é alterada pelos que criam e descartam escopos.
+        def op_const(arg: int, nxt: int):
+            value = consts[arg]
+
+            def handler():
+                push(value)
+                return nxt
+
+            return handler
+
+        def op_load(arg: int, nxt: int):
+            name = names[arg]
+
+            def handler():
+                try:
+                    push(ctx[name])
+                except KeyError:
+                    raise NameError(f"variável {name} não existe!")
+                return nxt
+
+            return handler
+
+        def op_load_at(arg: int, nxt: int):
+            depth, name = consts[arg]
+
+            def handler():
+                try:
+                    push(ctx.get_at(depth, name))
+                except KeyError:
+                    raise NameError(f"variável {name} não existe!")
+                return nxt
+
+            return handler
+
+        def op_assign(arg: int, nxt: int):
+            name = names[arg]
+
+            def handler():
+                ctx.assign(name, stack[-1])
+                return nxt
+
+            return handler
+
+        def op_assign_at(arg: int, nxt: int):
+            depth, name = consts[arg]
+
+            def handler():
+                ctx.assign_at(depth, name, stack[-1])
+                return nxt
+
+            return handler
+
+        def op_store(arg: int, nxt: int):
+            name = names[arg]
+
+            def handler():
+                ctx.assign(name, pop())
+                return nxt
+
+            return handler
+
+        def op_store_at(arg: int, nxt: int):
+            depth, name = consts[arg]
+
+            def handler():
+                ctx.assign_at(depth, name, pop())
+                return nxt
+
+            return handler
+
+        def op_define(arg: int, nxt: int):
+            name = names[arg]
+
+            def handler():
+                ctx.var_def(name, pop())
+                return nxt
+
+            return handler
+
+        def op_pop(arg: int, nxt: int):
+            def handler():
+                pop()
+                return nxt
+
+            return handler
+
+        def op_binop(arg: int, nxt: int):
+            func = consts[arg]
+
+            def handler():
+                right = pop()
+                stack[-1] = func(stack[-1], right)
+                return nxt
+
+            return handler
+
+        def op_add(arg: int, nxt: int):
+            func = consts[arg]
+
+            def handler():
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left + right
+                else:
+                    stack[-1] = func(left, right)
+                return nxt
+
+            return handler
+
+        def op_sub(arg: int, nxt: int):
+            func = consts[arg]
+
+            def handler():
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left - right
+                else:
+                    stack[-1] = func(left, right)
+                return nxt
+
+            return handler
+
+        def op_mul(arg: int, nxt: int):
+            func = consts[arg]
+
+            def handler():
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left * right
+                else:
+                    stack[-1] = func(left, right)
+                return nxt
+
+            return handler
+
+        def op_lt(arg: int, nxt: int):
+            func = consts[arg]
+
+            def handler():
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left < right
+                else:
+                    stack[-1] = func(left, right)
+                return nxt
+
+            return handler
+
+        def op_le(arg: int, nxt: int):
+            func = consts[arg]
+
+            def handler():
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left <= right
+                else:
+                    stack[-1] = func(left, right)
+                return nxt
+
+            return handler
+
+        def op_gt(arg: int, nxt: int):
+            func = consts[arg]
+
+            def handler():
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left > right
+                else:
+                    stack[-1] = func(left, right)
+                return nxt
+
+            return handler
+
+        def op_ge(arg: int, nxt: int):
+            func = consts[arg]
+
+            def handler():
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left >= right
+                else:
+                    stack[-1] = func(left, right)
+                return nxt
+
+            return handler
+
+        def op_unary(arg: int, nxt: int):
+            func = consts[arg]
+
+            # As negações mais comuns são feitas sem chamar a função
+            if func is runtime.not_:
+                def handler():
+                    value = stack[-1]
+                    stack[-1] = value is None or value is False
+                    return nxt
+            elif func is runtime.neg:
+                def handler():
+                    value = stack[-1]
+                    stack[-1] = -value if type(value) is float else func(value)
+                    return nxt
+            else:
+                def handler():
+                    stack[-1] = func(stack[-1])
+                    return nxt
+
+            return handler
+
+        def op_jump(arg: int, nxt: int):
+            def handler():
+                return arg
+
+            return handler
+
+        def op_jump_if_false(arg: int, nxt: int):
+            def handler():
+                value = pop()
+                if value is False or value is None:
+                    return arg
+                return nxt
+
+            return handler
+
+        def op_jump_if_false_or_pop(arg: int, nxt: int):
+            def handler():
+                value = stack[-1]
+                if value is False or value is None:
+                    return arg
+                pop()
+                return nxt
+
+            return handler
+
+        def op_jump_if_true_or_pop(arg: int, nxt: int):
+            def handler():
+                value = stack[-1]
+                if value is False or value is None:
+                    pop()
+                    return nxt
+                return arg
+
+            return handler
+
+        def op_call(arg: int, nxt: int):
+            def handler():
+                if arg:
+                    args = stack[-arg:]
+                    del stack[-arg:]
+                else:
+                    args = ()
+                func = stack[-1]
+                if type(func) is LoxFunction:
+                    stack[-1] = func.call(args)
+                    return nxt
+                try:
+                    stack[-1] = func(*args)
+                except TypeError:
+                    _check_callable(func)
+                    raise
+                return nxt
+
+            return handler
+
+        def op_getmethod(arg: int, nxt: int):
+            node = consts[arg]
+            method_for = node.method_for
+            get = node.get
+
+            def handler():
+                obj = stack[-1]
+                method = method_for(obj)
+                if method is None:
+                    stack[-1] = get(obj)
+                    push(None)
+                else:
+                    stack[-1] = method
+                    push(obj)
+                return nxt
+
+            return handler
+
+        def op_invoke(arg: int, nxt: int):
+            def handler():
+                if arg:
+                    args = stack[-arg:]
+                    del stack[-arg:]
+                else:
+                    args = ()
+                this = pop()
+                func = stack[-1]
+                if this is not None:
+                    stack[-1] = func.call_bound(this, args)
+                    return nxt
+                if type(func) is LoxFunction:
+                    stack[-1] = func.call(args)
+                    return nxt
+                try:
+                    stack[-1] = func(*args)
+                except TypeError:
+                    _check_callable(func)
+                    raise
+                return nxt
+
+            return handler
+
+        def op_print(arg: int, nxt: int):
+            def handler():
+                lox_print(pop())
+                return nxt
+
+            return handler
+
+        def op_print_const(arg: int, nxt: int):
+            text = consts[arg]
+
+            def handler():
+                builtins.print(text)
+                return nxt
+
+            return handler
+
+        def op_push_scope(arg: int, nxt: int):
+            def handler():
+                nonlocal ctx
+                if arg and pool:
+                    frame = pool.pop()
+                    frame.parent = ctx
+                    ctx = frame
+                else:
+                    ctx = ctx.push({})
+                return nxt
+
+            return handler
+
+        def op_pop_scope(arg: int, nxt: int):
+            def handler():
+                nonlocal ctx
+                frame = ctx
+                ctx = frame.parent  # type: ignore[assignment]
+                if arg:
+                    frame.scope.clear()
+                    frame.parent = None
+                    pool.append(frame)
+                return nxt
+
+            return handler
+
+        def op_eval(arg: int, nxt: int):
+            node_eval = consts[arg].eval
+
+            def handler():
+                push(node_eval(ctx))
+                return nxt
+
+            return handler
+
+        def op_exec(arg: int, nxt: int):
+            node_eval = consts[arg].eval
+
+            def handler():
+                node_eval(ctx)
+                return nxt
+
+            return handler
+
+        def op_getattr(arg: int, nxt: int):
+            get = consts[arg].get
+
+            def handler():
+                stack[-1] = get(stack[-1])
+                return nxt
+
+            return handler
+
+        def op_setattr(arg: int, nxt: int):
+            set_ = consts[arg].set
+
+            def handler():
+                value = pop()
+                stack[-1] = set_(stack[-1], value)
+                return nxt
+
+            return handler
+
+        factories = {
+            OP_CONST: op_const,
+            OP_LOAD: op_load,
+            OP_ASSIGN: op_assign,
+            OP_DEFINE: op_define,
+            OP_POP: op_pop,
+            OP_BINOP: op_binop,
+            OP_UNARY: op_unary,
+            OP_JUMP: op_jump,
+            OP_JUMP_IF_FALSE: op_jump_if_false,
+            OP_JUMP_IF_FALSE_OR_POP: op_jump_if_false_or_pop,
+            OP_JUMP_IF_TRUE_OR_POP: op_jump_if_true_or_pop,
+            OP_CALL: op_call,
+            OP_PRINT: op_print,
+            OP_PRINT_CONST: op_print_const,
+            OP_PUSH_SCOPE: op_push_scope,
+            OP_POP_SCOPE: op_pop_scope,
+            OP_EVAL: op_eval,
+            OP_EXEC: op_exec,
+            OP_STORE: op_store,
+            OP_LOAD_AT: op_load_at,
+            OP_ASSIGN_AT: op_assign_at,
+            OP_STORE_AT: op_store_at,
+            OP_ADD: op_add,
+            OP_SUB: op_sub,
+            OP_MUL: op_mul,
+            OP_LT: op_lt,
+            OP_LE: op_le,
+            OP_GT: op_gt,
+            OP_GE: op_ge,
+            OP_GETATTR: op_getattr,
+            OP_SETATTR: op_setattr,
+            OP_GETMETHOD: op_getmethod,
+            OP_INVOKE: op_invoke,
+        }
+
+        handlers = []
+        for ip, (op, arg) in enumerate(self.code.ops):
+            try:
+                factory = factories[op]
+            except KeyError:
+                raise RuntimeError(f"operação inválida: {op}")
+            handlers.append(factory(arg, ip + 1))
+
+        ip = 0
+        end = len(handlers)
+        while ip < end:
+            ip = handlers[ip]()
@@ -0,0 +1,66 @@
+import pytest
+
+from lox import *
+from lox.ast import *
+
+
+@pytest.mark.parametrize(
+    "src, value",
+    [
+        ("1 + 2 * 3", 7.0),
+        ('"a" + "b"', "ab"),
+        ("-(2 * 3)", -6.0),
+        ("!nil", True),
+        ("1 < 2 and 3", 3.0),
+        ("nil or 4", 4.0),
+    ],
+)
+def test_fold_reduz_expressões_constantes(src, value):
+    ast = fold(parse_expr(src))
+    assert isinstance(ast, Literal)
+    assert ast.value == value
+
+
+def test_fold_preserva_subexpressões_com_variáveis():
+    ast = fold(parse_expr("x + 2 * 3"))
+    assert isinstance(ast, BinOp)
+    assert isinstance(ast.left, Var)
+    assert ast.right == Literal(6.0)
+
+
+def test_fold_preserva_operações_inválidas():
+    ast = fold(parse_expr('"a" - 1'))
+    assert isinstance(ast, BinOp)
+
+
+def test_operações_entre_literais_são_dobradas_na_análise():
+    assert parse_expr("1 + 2 * 3") == Literal(7.0)
+    assert isinstance(parse_expr('"a" - 1'), BinOp)
+
+
+def test_programa_é_dobrado_na_primeira_execução():
+    ast = parse("var x = -(40 + 2);")
+    assert ast.stmts[0].initializer == UnaryOp(Literal(42.0), ast.stmts[0].initializer.op)
+
+    ctx = Ctx.from_dict({})
+    ast.eval(ctx)
+    assert ctx["x"] == -42
+    assert ast.stmts[0].initializer == Literal(-42.0)
+
+
+def test_literais_repetidos_são_compartilhados():
+    ast = parse('var a = nil; var b = nil; print 1; print 1; print "s" + "s"; var c;')
+    a, b, p1, p2, _, c = ast.stmts
+    assert a.initializer is b.initializer is c.initializer
+    assert p1.expr is p2.expr
+    assert parse("print 1;").stmts[0].expr is p1.expr
+
+
+def test_for_e_if_sem_partes_opcionais_geram_menos_nós():
+    [loop] = parse("for (; x;) print 1;").stmts
+    assert type(loop) is While and type(loop.body) is PrintConst
+    [cond] = parse("if (x) print 1;").stmts
+    assert cond.else_branch == Block([])
+    assert not cond.else_branch.scoped
+    [other] = parse("if (y) print 2;").stmts
+    assert other.else_branch is not cond.else_branch
@@ -0,0 +1,119 @@
+import pytest
+
+from lox import *
+from lox.ast import *
+
+
+def run(src: str) -> str:
+    import contextlib
+    import io
+
+    with contextlib.redirect_stdout(io.StringIO()) as fd:
+        parse(src).eval(Ctx.from_dict({}))
+    return fd.getvalue()
+
+
+def test_getattr_guarda_método_da_última_classe():
+    ast = parse_expr("obj.get")
+    a = LoxClass("A", {"get": LoxFunction("get", [], Block([]), Ctx())})
+    b = LoxClass("B", {"get": LoxFunction("get", [], Block([]), Ctx())})
+
+    ast.eval(Ctx.from_dict({"obj": LoxInstance(a)}))
+    assert ast._ic_class is a
+    ast.eval(Ctx.from_dict({"obj": LoxInstance(b)}))
+    assert ast._ic_class is b
+
+
+def test_campo_sobrepõe_método_cacheado():
+    src = """
+    class A { m() { return "método"; } }
+    var a = A();
+    for (var i = 0; i < 2; i = i + 1) {
+        print a.m();
+        a.m = A;
+    }
+    """
+    assert run(src) == "método\nA instance\n"
+
+
+def test_cache_respeita_classes_diferentes():
+    src = """
+    class A { m() { return "A"; } }
+    class B { m() { return "B"; } }
+    fun show(x) { print x.m(); }
+    show(A()); show(B()); show(A());
+    """
+    assert run(src) == "A\nB\nA\n"
+
+
+def test_super_guarda_método_da_superclasse():
+    src = """
+    class A { m() { return "A"; } }
+    class B < A { m() { return super.m() + "B"; } }
+    var b = B();
+    print b.m();
+    print b.m();
+    """
+    assert run(src) == "AB\nAB\n"
+
+    ast = Super("m")
+    a = LoxClass("A", {"m": LoxFunction("m", [], Block([]), Ctx())})
+    ctx = Ctx.from_dict({"super": a, "this": LoxInstance(a)})
+    ast.eval(ctx)
+    assert ast._ic_class is a
+    assert ast._ic_method is a.methods["m"]
+
+
+def test_falha_no_cache_busca_o_método_uma_vez(monkeypatch):
+    a = LoxClass("A", {"get": LoxFunction("get", [], Block([]), Ctx())})
+    calls = []
+    get_method = LoxClass.get_method
+    monkeypatch.setattr(
+        LoxClass, "get_method", lambda self, name: calls.append(name) or get_method(self, name)
+    )
+    ast = parse_expr("obj.get")
+    ast.eval(Ctx.from_dict({"obj": LoxInstance(a)}))
+    ast.eval(Ctx.from_dict({"obj": LoxInstance(a)}))
+    assert calls == ["get"]
+
+
+def test_atributo_inexistente():
+    ast = parse_expr("obj.nope")
+    with pytest.raises(AttributeError, match="não possui o atributo 'nope'"):
+        ast.eval(Ctx.from_dict({"obj": LoxInstance(LoxClass("A"))}))
+    assert ast._ic_class is None
+
+
+def test_chamada_de_método_não_vincula_a_função(monkeypatch):
+    src = """
+    class A { get(k) { return this.n + k; } }
+    var a = A();
+    a.n = 1;
+    print a.get(2);
+    fun f() { return a.get(3); }
+    print f();
+    a.get = clock;
+    print a.get() > 0;
+    """
+    ast = parse(src)
+    specialize(ast)
+    assert any(type(n) is Invoke for n in ast.descendants())
+    monkeypatch.setattr(
+        LoxFunction, "bind", lambda self, obj: pytest.fail("bind não deveria ser chamado")
+    )
+    assert run(src) == "3\n4\ntrue\n"
+
+
+def test_chamada_de_super_não_vincula_a_função(monkeypatch):
+    src = """
+    class A { m(x) { return x + 1; } }
+    class B < A { m(x) { return super.m(x) * 2; } }
+    print B().m(1);
+    """
+    ast = parse(src)
+    specialize(ast)
+    assert any(type(n) is SuperInvoke for n in ast.descendants())
+    monkeypatch.setattr(
+        LoxFunction, "bind", lambda self, obj: pytest.fail("bind não deveria ser chamado")
+    )
+    assert run(src) == "4\n"
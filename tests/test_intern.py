@@ -0,0 +1,28 @@
+import sys
+
+from lox import *
+from lox.ast import *
+
+
+def test_identificadores_são_internados():
+    # Os nomes são montados em tempo de execução para não coincidirem com as
+    # constantes deste arquivo, que o Python já interna.
+    base, sub, method, field, fn, arg = ("".join([n, "_x"]) for n in "BSmfga")
+    src = f"""
+    class {base} {{ {method}({arg}) {{ this.{field} = {arg}; }} }}
+    class {sub} < {base} {{ {method}({arg}) {{ super.{method}({arg}); }} }}
+    fun {fn}({arg}) {{ var {field} = {arg}; {field} = {sub}().{field}; }}
+    """
+    ast = parse(src)
+    names = []
+    for node in ast.descendants():
+        if isinstance(node, (Var, Assign, VarDef, Function, Class, Method, Getattr, Setattr)):
+            names.append(node.name)
+        if isinstance(node, Super):
+            names.append(node.method)
+        if isinstance(node, Class) and node.superclass:
+            names.append(node.superclass)
+
+    assert {base, sub, method, field, fn, arg} <= set(names)
+    for name in names:
+        assert name is sys.intern(name)
@@ -0,0 +1,193 @@
+from lox import *
+from lox.ast import *
+from lox.resolver import resolve
+
+
+def vars_named(ast: Node, name: str) -> list[Var]:
+    return [n for n in ast.descendants() if isinstance(n, Var) and n.name == name]
+
+
+def test_variáveis_globais_não_são_resolvidas():
+    ast = parse("var x = 1; print x;")
+    resolve(ast)
+    [x] = vars_named(ast, "x")
+    assert x.depth is None
+
+
+def test_profundidade_em_blocos_aninhados():
+    ast = parse("{ var x = 1; { print x; { x = 2; } } }")
+    resolve(ast)
+    [x] = vars_named(ast, "x")
+    assert x.depth == 1
+    [assign] = [n for n in ast.descendants() if isinstance(n, Assign)]
+    assert assign.depth == 2
+
+
+def test_parâmetros_e_corpo_de_funções():
+    ast = parse("fun f(a) { var b = a; return b; }")
+    resolve(ast)
+    [a] = vars_named(ast, "a")[1:]  # o primeiro é o parâmetro
+    [b] = vars_named(ast, "b")
+    assert a.depth == 1
+    assert b.depth == 0
+
+
+def test_métodos_enxergam_escopos_de_this_e_super():
+    src = """
+    {
+        var y = 1;
+        class A { f(x) { return x + y; } }
+        class B < A { g(x) { return x + y; } }
+    }
+    """
+    ast = parse(src)
+    resolve(ast)
+    [y_a, y_b] = vars_named(ast, "y")
+    # corpo -> parâmetros -> this -> bloco
+    assert y_a.depth == 3
+    # corpo -> parâmetros -> this -> super -> bloco
+    assert y_b.depth == 4
+
+
+def test_programa_resolvido_avalia_closures(capsys):
+    src = """
+    fun counter() {
+        var n = 0;
+        fun inc() { n = n + 1; return n; }
+        return inc;
+    }
+    var c = counter();
+    c();
+    print c();
+    """
+    parse(src).eval(Ctx.from_dict({}))
+    assert capsys.readouterr().out == "2\n"
+
+
+def test_blocos_sem_closures_reaproveitam_escopo():
+    ast = parse("{ var x = 1; } { fun f() { return 1; } }")
+    resolve(ast)
+    simple, with_fun = ast.stmts
+    assert simple.escapes is False
+    assert with_fun.escapes is True
+
+
+def test_escopos_reaproveitados_não_vazam_entre_iterações(capsys):
+    src = """
+    for (var i = 0; i < 3; i = i + 1) {
+        var x = i * 2;
+        print x;
+        { var y = x + 1; print y; }
+    }
+    fun make(n) { { var k = n; fun get() { return k; } return get; } }
+    var a = make(1);
+    var b = make(2);
+    print a() + b();
+    """
+    parse(src).eval(Ctx.from_dict({}))
+    assert capsys.readouterr().out == "0\n1\n2\n3\n4\n5\n3\n"
+
+
+def test_this_e_super_são_resolvidos(capsys):
+    src = """
+    class A { f() { return "A"; } }
+    class B < A {
+        f() { { var x = this; return super.f() + x.g(); } }
+        g() { return "B"; }
+    }
+    print B().f();
+    """
+    ast = parse(src)
+    resolve(ast)
+    [this] = [n for n in ast.descendants() if isinstance(n, This)]
+    [sup] = [n for n in ast.descendants() if isinstance(n, Super)]
+    # bloco interno -> corpo -> parâmetros -> this
+    assert this.depth == 3
+    assert sup.depth == 4
+
+    ast.eval(Ctx.from_dict({}))
+    assert capsys.readouterr().out == "AB\n"
+
+
+def functions(ast: Node) -> dict[str, Function]:
+    return {n.name: n for n in ast.descendants() if isinstance(n, Function)}
+
+
+def test_funções_puras_são_marcadas():
+    src = """
+    var g = 1;
+    fun square(x) { var y = x * x; return y; }
+    fun uses_global(x) { return x + g; }
+    fun prints(x) { print x; }
+    fun calls(x) { return square(x); }
+    fun outer(a) {
+        fun inner(b) { return a + b; }
+        return inner;
+    }
+    """
+    ast = parse(src)
+    resolve(ast)
+    fs = functions(ast)
+    assert fs["square"].pure
+    assert not fs["uses_global"].pure
+    assert not fs["prints"].pure
+    assert not fs["calls"].pure
+    assert not fs["outer"].pure
+    assert not fs["inner"].pure
+
+
+def test_funções_puras_guardam_resultados():
+    src = """
+    fun f(x) { return x == true; }
+    var a = f(true);
+    var b = f(1);
+    var c = f(true);
+    """
+    ctx = Ctx.from_dict({})
+    parse(src).eval(ctx)
+    assert (ctx["a"], ctx["b"], ctx["c"]) == (True, False, True)
+    assert len(ctx["f"].memo) == 2
+
+
+def test_contextos_reaproveitados_não_guardam_referências():
+    ast = parse("{ var x = 1; { var y = x; } }")
+    resolve(ast)
+    Block.pool.clear()
+    ctx = Ctx.from_dict({})
+    for stmt in ast.stmts:
+        stmt.eval(ctx)
+    assert Block.pool
+    assert all(frame.parent is None and not frame.scope for frame in Block.pool)
+
+
+def test_corpo_do_for_não_cria_escopo(capsys):
+    ast = parse("{ for (var i = 0; i < 2; i = i + 1) { print i; } }")
+    resolve(ast)
+    # o bloco que junta corpo e incremento não conta como escopo
+    assert [v.depth for v in vars_named(ast, "i")] == [0, 1, 0]
+    [assign] = [n for n in ast.descendants() if isinstance(n, Assign)]
+    assert assign.depth == 0
+    ast.eval(Ctx.from_dict({}))
+    assert capsys.readouterr().out == "0\n1\n"
+
+
+def test_declaração_posterior_mantém_busca_dinâmica(capsys):
+    src = """
+    var a = "g";
+    {
+        var a = "o";
+        {
+            fun show() { print a; }
+            show();
+            var a = "i";
+            show();
+        }
+    }
+    """
+    ast = parse(src)
+    resolve(ast)
+    # o bloco interno declara 'a' depois da função
+    [a] = vars_named(ast, "a")
+    assert a.depth is None
+    parse(src).eval(Ctx.from_dict({}))
+    assert capsys.readouterr().out == "o\ni\n"
@@ -0,0 +1,37 @@
+from lox import *
+from lox.ast import *
+from lox.runtime import ReturnMarker
+
+
+def test_return_é_propagado_por_laços_e_blocos(capsys):
+    src = """
+    fun find(n) {
+        for (var i = 0; i < 10; i = i + 1) {
+            { if (i == n) return i * 2; }
+        }
+        return "none";
+    }
+    print find(3);
+    print find(20);
+    """
+    parse(src).eval(Ctx.from_dict({}))
+    assert capsys.readouterr().out == "6\nnone\n"
+
+
+def test_return_não_lança_exceção():
+    result = Return(Literal(42.0)).eval(Ctx.from_dict({}))
+    assert isinstance(result, ReturnMarker)
+    assert result.value == 42
+
+
+def test_for_com_inicializador_expressão_dentro_de_função(capsys):
+    src = """
+    fun f() {
+        var i;
+        for (i = 0; i < 3; i = i + 1) print i;
+        return i;
+    }
+    print f();
+    """
+    parse(src).eval(Ctx.from_dict({}))
+    assert capsys.readouterr().out == "0\n1\n2\n3\n"
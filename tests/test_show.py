@@ -0,0 +1,22 @@
+import pytest
+
+from lox.runtime import show
+
+
+@pytest.mark.parametrize(
+    "value, text",
+    [
+        (42.0, "42"),
+        (-3.0, "-3"),
+        (0.0, "0"),
+        (-0.0, "-0"),
+        (3.5, "3.5"),
+        (1e16, "1e+16"),
+        (float("inf"), "inf"),
+        ("texto", "texto"),
+        (None, "nil"),
+        (True, "true"),
+    ],
+)
+def test_representação_de_valores(value, text):
+    assert show(value) == text
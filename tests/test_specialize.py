@@ -0,0 +1,178 @@
+import pytest
+
+from lox import *
+from lox.ast import *
+
+
+@pytest.mark.parametrize(
+    "src, cls",
+    [("f()", Call0), ("f(1)", Call1), ("f(1, 2)", Call2), ("f(1, 2, 3)", Call3)],
+)
+def test_chamadas_especializadas_por_aridade(src, cls):
+    ast = parse_expr(src)
+    specialize(ast)
+    assert type(ast) is cls
+    assert isinstance(ast, Call)
+    assert ast.eval(Ctx.from_dict({"f": lambda *args: sum(args)})) == sum(
+        range(1, len(ast.params) + 1)
+    )
+
+
+def test_chamada_com_muitos_argumentos_não_é_especializada():
+    ast = parse_expr("f(1, 2, 3, 4)")
+    specialize(ast)
+    assert type(ast) is Call
+
+
+def test_chamada_especializada_de_não_função():
+    ast = parse_expr("f(1)")
+    specialize(ast)
+    with pytest.raises(TypeError, match="não é uma função"):
+        ast.eval(Ctx.from_dict({"f": 42.0}))
+
+
+@pytest.mark.parametrize(
+    "cond, expected",
+    [("x < 2", True), ("x == 1 and !false", True), ("x", False), ("x < 2 and x", False)],
+)
+def test_condicionais_booleanas_são_especializadas(cond, expected):
+    ast = parse(f"if ({cond}) print 1; else print 2;")
+    specialize(ast)
+    [stmt] = ast.stmts
+    assert (type(stmt) is IfBool) is expected
+    assert isinstance(stmt, If)
+
+
+def test_condicional_booleana_escolhe_o_ramo_correto(capsys):
+    ast = parse("if (x > 1) print 1; else print 2;")
+    specialize(ast)
+    [stmt] = ast.stmts
+    stmt.eval(Ctx.from_dict({"x": 2.0}))
+    stmt.eval(Ctx.from_dict({"x": 0.0}))
+    assert capsys.readouterr().out == "1\n2\n"
+
+
+@pytest.mark.parametrize(
+    "src, cls, value",
+    [
+        ("x + 1", AddNum, 3.0),
+        ("x - 1", SubNum, 1.0),
+        ("x * 3", MulNum, 6.0),
+        ("x < 3", LtNum, True),
+        ("x <= 1", LeNum, False),
+        ("x > 1", GtNum, True),
+        ("x >= 3", GeNum, False),
+        ("x / 2", BinOp, 1.0),
+    ],
+)
+def test_operações_numéricas_são_especializadas(src, cls, value):
+    ast = parse_expr(src)
+    specialize(ast)
+    assert type(ast) is cls
+    assert ast.eval(Ctx.from_dict({"x": 2.0})) == value
+
+
+def test_operação_especializada_preserva_semântica_de_outros_tipos():
+    ast = parse_expr("x + y")
+    specialize(ast)
+    assert ast.eval(Ctx.from_dict({"x": "a", "y": "b"})) == "ab"
+    with pytest.raises(LoxError):
+        ast.eval(Ctx.from_dict({"x": "a", "y": 1.0}))
+
+
+def test_vm_operações_numéricas_rápidas(capsys):
+    src = 'var s = "a" + "b"; var n = 1 + 2 * 3 - 4; print s; print n < 4; print n >= 3;'
+    ctx = Ctx.from_dict({})
+    parse(src).eval(ctx)
+    assert capsys.readouterr().out == "ab\ntrue\ntrue\n"
+    with pytest.raises(LoxError):
+        parse('var x = "a"; print x - 1;').eval(Ctx.from_dict({}))
+
+
+def test_soma_de_strings_troca_de_especialização():
+    ast = parse_expr("x + y")
+    specialize(ast)
+    assert ast.eval(Ctx.from_dict({"x": 1.0, "y": 2.0})) == 3.0
+    assert type(ast) is AddNum
+    assert ast.eval(Ctx.from_dict({"x": "a", "y": "b"})) == "ab"
+    assert type(ast) is AddStr
+    assert ast.eval(Ctx.from_dict({"x": 1.0, "y": 2.0})) == 3.0
+    with pytest.raises(LoxError):
+        ast.eval(Ctx.from_dict({"x": "a", "y": 1.0}))
+
+
+def test_argumentos_usam_a_classe_atual_dos_nós(monkeypatch):
+    calls = []
+    add_num = AddNum.eval
+
+    def counted(self, ctx):
+        calls.append(self)
+        return add_num(self, ctx)
+
+    monkeypatch.setattr(AddNum, "eval", counted)
+    ast = parse_expr("f(1, 2, 3, x + y)")
+    specialize(ast)
+    ctx = Ctx.from_dict({"f": lambda *args: args[-1], "x": "a", "y": "b"})
+    assert ast.eval(ctx) == "ab"
+    assert type(ast.params[-1]) is AddStr
+    # depois da troca, o argumento é avaliado diretamente por AddStr
+    ctx["y"] = "c"
+    assert ast.eval(ctx) == "ac"
+    assert len(calls) == 1
+
+
+def test_laços_com_condição_booleana_são_especializados(capsys):
+    ast = parse("var i = 0; while (i < 2) { print i; i = i + 1; } while (i) i = nil;")
+    specialize(ast)
+    loop_bool, loop = [n for n in ast.descendants() if isinstance(n, While)]
+    assert type(loop_bool) is WhileBool
+    assert type(loop) is While
+    ctx = Ctx.from_dict({})
+    for stmt in ast.stmts:
+        stmt.eval(ctx)
+    assert capsys.readouterr().out == "0\n1\n"
+    assert ctx["i"] is None
+
+
+@pytest.mark.parametrize(
+    "src, cls, env, value",
+    [
+        ("-x", NegNum, {"x": 2.0}, -2.0),
+        ("!x", Not, {"x": 0.0}, False),
+        ("!x", Not, {"x": None}, True),
+    ],
+)
+def test_operações_unárias_são_especializadas(src, cls, env, value):
+    ast = parse_expr(src)
+    specialize(ast)
+    assert type(ast) is cls
+    assert ast.eval(Ctx.from_dict(env)) == value
+
+
+def test_negação_especializada_preserva_erros():
+    ast = parse_expr("-x")
+    specialize(ast)
+    with pytest.raises(LoxError):
+        ast.eval(Ctx.from_dict({"x": "a"}))
+    with pytest.raises(LoxError):
+        parse('var x = "a"; print -x;').eval(Ctx.from_dict({}))
+
+
+
+def test_laço_infinito_não_avalia_condição(capsys):
+    src = "fun f() { var i = 0; for (;;) { i = i + 1; if (i > 2) return i; } } print f();"
+    ast = parse(src)
+    specialize(ast)
+    assert any(type(n) is WhileTrue for n in ast.descendants())
+    parse(src).eval(Ctx.from_dict({}))
+    assert capsys.readouterr().out == "3\n"
+
+    def stop():
+        raise StopIteration
+
+    # No programa principal, o laço é executado pela VM
+    with pytest.raises(StopIteration):
+        parse("var n = 0; while (true) { n = n + 1; print n; if (n > 1) stop(); }").eval(
+            Ctx.from_dict({"stop": stop})
+        )
+    assert capsys.readouterr().out == "1\n2\n"
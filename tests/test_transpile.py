@@ -0,0 +1,112 @@
+import pytest
+
+from lox import *
+from lox.ast import *
+from lox.transpile import transpile
+
+
+def run(src: str) -> tuple[str, Ctx]:
+    import contextlib
+    import io
+
+    ctx = Ctx.from_dict({})
+    with contextlib.redirect_stdout(io.StringIO()) as fd:
+        parse(src).eval(ctx)
+    return fd.getvalue(), ctx
+
+
+@pytest.fixture
+def hot(monkeypatch):
+    # Traduz as funções já na primeira chamada
+    monkeypatch.setattr(runtime, "HOT_CALLS", 1)
+
+
+def test_função_quente_é_traduzida():
+    src = """
+    fun fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); }
+    print fib(15);
+    """
+    out, ctx = run(src)
+    assert out == "610\n"
+    assert callable(ctx["fib"].compiled)
+
+
+@pytest.mark.parametrize(
+    "body, expected",
+    [
+        ("var x = 1; { var x = 2; print x; } print x;", "2\n1\n"),
+        ('print "a" + "b"; print 1 + 2; print nil or "x"; print 1 and false;', "ab\n3\nx\nfalse\n"),
+        ("var i = 0; while (i < 3) { var j = i * 2; i = i + 1; print j; }", "0\n2\n4\n"),
+        ("for (var i = 1; i < 3; i = i + 1) print -i; print !nil;", "-1\n-2\ntrue\n"),
+        ("g = g + 1; print g; print clock() > 0;", "2\ntrue\n"),
+    ],
+)
+def test_código_traduzido_preserva_semântica(hot, body, expected):
+    out, _ = run(f"var g = 1; fun f() {{ {body} }} f();")
+    assert out == expected
+
+
+def test_variáveis_livres_e_this(hot):
+    src = """
+    class A {
+        init(n) { this.n = n; }
+        add(k) { this.n = this.n + k; return this; }
+    }
+    {
+        var total = 0;
+        var a = A(1);
+        fun step(k) { total = total + a.add(k).n; }
+        step(1); step(2);
+        print total;
+    }
+    """
+    assert run(src)[0] == "6\n"
+
+
+def test_erros_são_os_mesmos_do_interpretador(hot):
+    with pytest.raises(LoxError):
+        run('fun f(x) { return x - 1; } f("a");')
+    with pytest.raises(NameError, match="variável y não existe"):
+        run("fun f() { return y; } f();")
+    with pytest.raises(TypeError, match="não é uma função"):
+        run("fun f(x) { return x(); } f(1);")
+
+
+def test_funções_com_closures_não_são_traduzidas():
+    ctx = Ctx.from_dict({})
+    parse("fun f() { fun g() {} return g; }").eval(ctx)
+    assert transpile(ctx["f"]) is None
+
+
+def test_métodos_com_super_são_traduzidos(hot):
+    src = """
+    class A { m(x) { return x + 1; } }
+    class B < A { m(x) { var f = super.m; return super.m(x) + f(x); } }
+    var b = B();
+    print b.m(1);
+    """
+    out, ctx = run(src)
+    assert out == "4\n"
+    assert callable(ctx["B"].methods["m"].compiled)
+
+
+def test_tradução_fica_no_corpo_da_função():
+    ctx = Ctx.from_dict({})
+    parse("fun f(x) { return x + 1; }").eval(ctx)
+    f = ctx["f"]
+    compiled = transpile(f)
+    assert f.body._compiled is compiled
+    # Outra função com o mesmo corpo reaproveita a tradução
+    g = LoxFunction(f.name, f.params, f.body, f.ctx)
+    assert transpile(g) is compiled
+
+
+def test_nomes_que_não_são_identificadores_python(hot):
+    src = """
+    fun f(a²) { var bª = a² + 1; return bª; }
+    print f(1);
+    print f(2);
+    """
+    out, ctx = run(src)
+    assert out == "2\n3\n"
+    assert callable(ctx["f"].compiled)
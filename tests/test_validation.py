@@ -0,0 +1,13 @@
+import lox
+from lox import *
+from lox.ast import *
+
+
+def test_eval_valida_o_código_uma_única_vez(monkeypatch):
+    calls = []
+    validate_tree = Node.validate_tree
+    monkeypatch.setattr(Node, "validate_tree", lambda self: calls.append(self) or validate_tree(self))
+    lox.eval("var x = 1;")
+    assert len(calls) == 1
+    lox.eval(parse("var x = 1;"))
+    assert len(calls) == 3
@@ -0,0 +1,104 @@
+import pytest
+
+from lox import *
+from lox.ast import *
+from lox.vm import OP_EXEC, VM, Compiler
+
+
+def run(src: str, env: dict | None = None) -> Ctx:
+    ctx = Ctx.from_dict(env or {})
+    parse(src).eval(ctx)
+    return ctx
+
+
+def test_programa_reaproveita_bytecode():
+    ast = parse("var x = 1;")
+    ast.eval(Ctx.from_dict({}))
+    code = ast._code
+    assert code is not None
+
+    ast.eval(Ctx.from_dict({}))
+    assert ast._code is code
+
+
+def test_vm_executa_laços_e_condicionais():
+    src = """
+    var total = 0;
+    for (var i = 0; i < 10; i = i + 1) {
+        if (i > 4 and i != 7) total = total + i;
+        else total = total - 1;
+    }
+    """
+    assert run(src)["total"] == 5 + 6 + 8 + 9 - 6
+
+
+def test_vm_operadores_lógicos_retornam_operandos():
+    ctx = run('var a = nil or "x"; var b = false and 1; var c = 1 or 2;')
+    assert ctx["a"] == "x"
+    assert ctx["b"] is False
+    assert ctx["c"] == 1
+
+
+def test_vm_chama_funções_nativas(capsys):
+    run("print f(1, 2);", {"f": lambda a, b: a + b})
+    assert capsys.readouterr().out == "3\n"
+
+
+def test_vm_delega_nós_não_compilados_ao_interpretador():
+    ast = parse("fun f(x) { return x * 2; } var y = f(21);")
+    code = Compiler().compile(ast)
+    assert code.ops[0] == (OP_EXEC, 0)
+    assert isinstance(code.consts[0], Function)
+
+    ctx = Ctx.from_dict({})
+    VM(code).run(ctx)
+    assert ctx["y"] == 42
+
+
+def test_vm_variável_inexistente():
+    with pytest.raises(NameError):
+        run("print x;")
+
+
+def test_compilador_compartilha_constantes_iguais():
+    code = Compiler().compile(parse("var a = 1; var b = 1; var c = true; var d = -0;"))
+    assert [c for c in code.consts if type(c) is float and c == 1] == [1.0]
+    assert any(c is True for c in code.consts)
+    ctx = Ctx.from_dict({})
+    VM(code).run(ctx)
+    assert ctx["a"] is ctx["b"]
+    assert ctx["c"] is True
+
+
+def test_vm_compila_acesso_a_atributos(capsys):
+    from lox.vm import OP_EVAL, OP_GETATTR, OP_SETATTR
+
+    src = """
+    class P { init(x) { this.x = x; } get() { return this.x; } }
+    var p = P(1);
+    p.y = p.x + 1;
+    print p.get() + p.y;
+    """
+    ast = parse(src)
+    ops = {op for op, _ in ast.code().ops}
+    assert {OP_GETATTR, OP_SETATTR} <= ops
+    assert OP_EVAL not in ops
+
+    ast.eval(Ctx.from_dict({}))
+    assert capsys.readouterr().out == "3\n"
+
+
+def test_print_de_literais_usa_texto_pronto(capsys):
+    from lox.vm import OP_PRINT, OP_PRINT_CONST
+
+    ast = parse('print 1 + 2; print "oi"; print nil; print -(1);')
+    assert isinstance(ast.stmts[0], PrintConst)
+    assert ast.stmts[0].text == "3"
+    assert type(ast.stmts[3]) is Print
+
+    ops = [op for op, _ in ast.code().ops]
+    assert ops == [OP_PRINT_CONST] * 4
+    assert OP_PRINT not in ops
+
+    ast.eval(Ctx.from_dict({}))
+    assert capsys.readouterr().out == "3\noi\nnil\n-1\n"